@@ -0,0 +1,198 @@
+# Pluggable AI providers behind get_ai_response
+#
+# AI_PROVIDER=emergent (default) talks to Gemini through the Emergent LLM Key.
+# AI_PROVIDER=fake returns deterministic templated text with simulated latency,
+# so the AI endpoints can be load tested and benchmarked without network.
+
+import asyncio
+import hashlib
+import math
+import os
+import random
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
+import httpx
+import litellm
+from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+
+class AIProvider(ABC):
+    """Base interface every AI provider implements; subclasses must provide complete()"""
+    name = "base"
+
+    def is_configured(self) -> bool:
+        return True
+
+    async def startup(self) -> None:
+        """Acquire long-lived resources (connection pools, etc.)"""
+
+    async def aclose(self) -> None:
+        """Release resources acquired in startup()"""
+
+    @abstractmethod
+    async def complete(self, prompt: str, system_message: str) -> str:
+        """Return the full response text"""
+
+    async def stream(self, prompt: str, system_message: str) -> AsyncIterator[str]:
+        """Yield the response in chunks. Default: a single chunk from complete()"""
+        yield await self.complete(prompt, system_message)
+
+
+class EmergentProvider(AIProvider):
+    """Gemini via the Emergent LLM Key, sharing one pooled keep-alive HTTP client"""
+    name = "emergent"
+
+    def __init__(self, api_key: str, pool_size: int = 10, keepalive_seconds: float = 60.0,
+                 timeout_seconds: float = 120.0):
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+        self.timeout_seconds = timeout_seconds
+        self.http_client: Optional[httpx.AsyncClient] = None
+
+    def is_configured(self) -> bool:
+        return bool(self.api_key)
+
+    async def startup(self) -> None:
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.pool_size,
+                max_keepalive_connections=self.pool_size,
+                keepalive_expiry=self.keepalive_seconds
+            ),
+            timeout=httpx.Timeout(self.timeout_seconds, connect=10.0)
+        )
+        litellm.aclient_session = self.http_client
+
+    async def aclose(self) -> None:
+        if self.http_client is not None:
+            await self.http_client.aclose()
+            self.http_client = None
+            litellm.aclient_session = None
+
+    async def complete(self, prompt: str, system_message: str) -> str:
+        # LlmChat is a thin per-conversation wrapper; the pooled transport
+        # (litellm.aclient_session) is what gets reused across requests
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=f"beast-{datetime.now().timestamp()}",
+            system_message=system_message
+        ).with_model("gemini", "gemini-2.5-pro")
+        return await chat.send_message(UserMessage(text=prompt))
+
+
+class LatencyModel:
+    """Samples simulated response latency in seconds.
+
+    Supported distributions: fixed, uniform, normal, lognormal, exponential.
+    mean_ms/stddev_ms are interpreted per distribution (uniform uses
+    mean ± stddev, exponential ignores stddev).
+    """
+    DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+    def __init__(self, distribution: str = "fixed", mean_ms: float = 0.0, stddev_ms: float = 0.0):
+        if distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.distribution = distribution
+        self.mean_ms = max(0.0, mean_ms)
+        self.stddev_ms = max(0.0, stddev_ms)
+
+    def sample(self, rng: random.Random) -> float:
+        mean, sd = self.mean_ms, self.stddev_ms
+        if self.distribution == "fixed" or mean == 0:
+            ms = mean
+        elif self.distribution == "uniform":
+            ms = rng.uniform(mean - sd, mean + sd)
+        elif self.distribution == "normal":
+            ms = rng.gauss(mean, sd)
+        elif self.distribution == "lognormal":
+            # Parameterise so the samples have the requested mean/stddev
+            sigma2 = math.log1p((sd / mean) ** 2)
+            ms = rng.lognormvariate(math.log(mean) - sigma2 / 2, sigma2 ** 0.5)
+        else:
+            ms = rng.expovariate(1.0 / mean)
+        return max(0.0, ms) / 1000.0
+
+
+class FakeProvider(AIProvider):
+    """Deterministic local stand-in for benchmarking the AI path offline.
+
+    The same (system_message, prompt) always yields the same text. The reply
+    mirrors the numbered sections the prompt asks for, so downstream parsing
+    sees realistic structure. Latency is drawn from `latency` using its own
+    RNG (seeded by `seed`), so repeated prompts still exercise the whole
+    distribution; when streaming, `token_delay` is slept between tokens.
+    """
+    name = "fake"
+
+    SECTION_PATTERN = re.compile(r"^\s*\d+\.\s+(?:\*\*)?([^*\n(]+?)(?:\*\*)?\s*(?:\(.*\))?\s*$", re.MULTILINE)
+    FILLER = [
+        "Prioritise protein at every meal.",
+        "Batch prep on Sunday to remove decisions during the week.",
+        "Keep the 2-day rule: never miss twice in a row.",
+        "Track the trend, not the single weigh-in.",
+        "Sleep 7+ hours to protect recovery.",
+        "Hit the compound lifts first while fresh.",
+    ]
+
+    def __init__(self, latency: Optional[LatencyModel] = None, token_delay: Optional[LatencyModel] = None,
+                 seed: Optional[int] = None):
+        self.latency = latency or LatencyModel()
+        self.token_delay = token_delay or LatencyModel()
+        self.latency_rng = random.Random(seed)
+
+    def _rng(self, prompt: str, system_message: str) -> random.Random:
+        digest = hashlib.sha256(f"{system_message}\x00{prompt}".encode()).hexdigest()
+        return random.Random(int(digest[:16], 16))
+
+    def render(self, prompt: str, system_message: str) -> str:
+        """Build the deterministic templated reply for a prompt"""
+        rng = self._rng(prompt, system_message)
+        title = prompt.strip().splitlines()[0] if prompt.strip() else "Response"
+        sections = [s.strip() for s in self.SECTION_PATTERN.findall(prompt)] or ["Summary"]
+        lines: List[str] = [f"# {title}", ""]
+        for section in sections:
+            lines.append(f"## {section}")
+            for tip in rng.sample(self.FILLER, 2):
+                lines.append(f"- {tip}")
+            lines.append("")
+        return "\n".join(lines).strip()
+
+    async def complete(self, prompt: str, system_message: str) -> str:
+        await asyncio.sleep(self.latency.sample(self.latency_rng))
+        return self.render(prompt, system_message)
+
+    async def stream(self, prompt: str, system_message: str) -> AsyncIterator[str]:
+        # First-token latency, then per-token gaps
+        await asyncio.sleep(self.latency.sample(self.latency_rng))
+        for token in re.findall(r"\S+\s*", self.render(prompt, system_message)):
+            yield token
+            await asyncio.sleep(self.token_delay.sample(self.latency_rng))
+
+
+def provider_from_env(api_key: str) -> AIProvider:
+    """Select and configure the AI provider from environment variables"""
+    kind = os.environ.get("AI_PROVIDER", "emergent").lower()
+    if kind == "fake":
+        return FakeProvider(
+            latency=LatencyModel(
+                os.environ.get("AI_FAKE_LATENCY_DIST", "fixed"),
+                float(os.environ.get("AI_FAKE_LATENCY_MEAN_MS", "0")),
+                float(os.environ.get("AI_FAKE_LATENCY_STDDEV_MS", "0"))
+            ),
+            token_delay=LatencyModel(
+                "fixed", float(os.environ.get("AI_FAKE_TOKEN_DELAY_MS", "0"))
+            ),
+            seed=int(os.environ["AI_FAKE_SEED"]) if os.environ.get("AI_FAKE_SEED") else None
+        )
+    if kind != "emergent":
+        raise ValueError(f"Unknown AI_PROVIDER: {kind}")
+    return EmergentProvider(
+        api_key=api_key,
+        pool_size=int(os.environ.get("AI_POOL_SIZE", "10")),
+        keepalive_seconds=float(os.environ.get("AI_KEEPALIVE_SECONDS", "60")),
+        timeout_seconds=float(os.environ.get("AI_TIMEOUT_SECONDS", "120"))
+    )
@@ -0,0 +1,426 @@
+# Body-composition analytics over the metrics history (NumPy)
+#
+# Functions here are pure: they take plain metric dicts ({date, timestamp,
+# weight, body_fat, ...}) and return JSON-ready dicts/lists, so server.py can cache the
+# results in Mongo as-is.
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Collection, Dict, List, Optional
+
+import numpy as np
+
+BODY_FAT_GOAL = 12.0
+SMOOTHING_HALF_LIFE_DAYS = 7.0
+RATE_WINDOW_DAYS = 7.0
+REGRESSION_WINDOW_DAYS = 56
+Z_95 = 1.96
+
+
+def metric_day(metric: Dict[str, Any]) -> datetime:
+    """Calendar day (UTC) of a metric from its timestamp (a datetime, naive meaning UTC, or an ISO string)"""
+    timestamp = metric["timestamp"]
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return datetime(timestamp.year, timestamp.month, timestamp.day)
+
+
+def metric_days(metrics: List[Dict[str, Any]]) -> np.ndarray:
+    """Days since the first metric, from the timestamps"""
+    ordinals = np.array([metric_day(m).toordinal() for m in metrics], dtype=float)
+    return ordinals - ordinals[0] if len(ordinals) else ordinals
+
+
+def exponential_smooth(days: np.ndarray, values: np.ndarray, half_life: float = SMOOTHING_HALF_LIFE_DAYS) -> np.ndarray:
+    """Time-aware exponential smoothing: the weight of a gap decays with its length in days"""
+    smoothed = np.empty_like(values)
+    if len(values) == 0:
+        return smoothed
+    # Per-step blend factors computed in one shot; only the recurrence itself is sequential
+    alphas = 1.0 - np.exp2(-np.diff(days) / half_life)
+    smoothed[0] = values[0]
+    for i, alpha in enumerate(alphas, start=1):
+        smoothed[i] = smoothed[i - 1] + alpha * (values[i] - smoothed[i - 1])
+    return smoothed
+
+
+def rolling_rate_per_week(days: np.ndarray, smoothed: np.ndarray, window: float = RATE_WINDOW_DAYS) -> np.ndarray:
+    """Change of the smoothed series over the trailing window, expressed per 7 days"""
+    if len(days) < 2:
+        return np.zeros_like(smoothed)
+    start = np.maximum(days - window, days[0])
+    span = days - start
+    past = np.interp(start, days, smoothed)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(span > 0, (smoothed - past) / span * 7.0, 0.0)
+    return rate
+
+
+def linear_fit(days: np.ndarray, values: np.ndarray) -> Optional[Dict[str, float]]:
+    """Least-squares line with the standard errors needed for confidence bands"""
+    n = len(days)
+    if n < 3 or np.ptp(days) == 0:
+        return None
+    slope, intercept = np.polyfit(days, values, 1)
+    residuals = values - (slope * days + intercept)
+    dof = n - 2
+    sigma = float(np.sqrt(residuals @ residuals / dof))
+    mean_day = float(days.mean())
+    sxx = float(((days - mean_day) ** 2).sum())
+    return {
+        "slope": float(slope),
+        "intercept": float(intercept),
+        "sigma": sigma,
+        "slope_se": sigma / np.sqrt(sxx),
+        "mean_day": mean_day,
+        "sxx": sxx,
+        "n": n,
+    }
+
+
+def confidence_band(fit: Dict[str, float], days: np.ndarray) -> np.ndarray:
+    """95% half-width of the fitted mean at each day"""
+    return Z_95 * fit["sigma"] * np.sqrt(1.0 / fit["n"] + (days - fit["mean_day"]) ** 2 / fit["sxx"])
+
+
+def goal_eta(fit: Dict[str, float], last_day: float, start_date: datetime, goal: float = BODY_FAT_GOAL) -> Dict[str, Any]:
+    """Date the fitted body-fat line crosses the goal, with a range from the slope's 95% interval"""
+    result: Dict[str, Any] = {"eta_date": None, "eta_earliest": None, "eta_latest": None, "on_track": False}
+    current = fit["slope"] * last_day + fit["intercept"]
+    if current <= goal:
+        result.update(eta_date=(start_date + timedelta(days=last_day)).strftime("%Y-%m-%d"), on_track=True)
+        return result
+    if fit["slope"] >= 0:
+        return result
+
+    def crossing(slope: float) -> Optional[str]:
+        if slope >= 0:
+            return None
+        return (start_date + timedelta(days=last_day + (goal - current) / slope)).strftime("%Y-%m-%d")
+
+    result.update(
+        eta_date=crossing(fit["slope"]),
+        eta_earliest=crossing(fit["slope"] - Z_95 * fit["slope_se"]),
+        eta_latest=crossing(fit["slope"] + Z_95 * fit["slope_se"]),
+        on_track=True
+    )
+    return result
+
+
+def metrics_trend(metrics: List[Dict[str, Any]], goal: float = BODY_FAT_GOAL) -> Dict[str, Any]:
+    """Smoothed weight/body fat, weekly rates, regression ETA to the goal and confidence bands.
+
+    `metrics` must be sorted oldest first by timestamp.
+    """
+    if not metrics:
+        return {"series": [], "summary": None}
+
+    days = metric_days(metrics)
+    weight = np.array([m.get("weight", 0) for m in metrics], dtype=float)
+    body_fat = np.array([m.get("body_fat", 0) for m in metrics], dtype=float)
+
+    weight_smoothed = exponential_smooth(days, weight)
+    bf_smoothed = exponential_smooth(days, body_fat)
+    weight_rate = rolling_rate_per_week(days, weight_smoothed)
+    bf_rate = rolling_rate_per_week(days, bf_smoothed)
+
+    # Regress body fat over the recent window only, so old phases don't dominate the ETA
+    recent = days >= days[-1] - REGRESSION_WINDOW_DAYS
+    fit = linear_fit(days[recent], body_fat[recent])
+    band = np.full(len(days), np.nan)
+    fitted = np.full(len(days), np.nan)
+    if fit:
+        fitted[recent] = fit["slope"] * days[recent] + fit["intercept"]
+        band[recent] = confidence_band(fit, days[recent])
+
+    def rounded(values: np.ndarray, index: int, digits: int = 2) -> Optional[float]:
+        value = values[index]
+        return None if np.isnan(value) else round(float(value), digits)
+
+    series = [
+        {
+            "date": m["date"],
+            "weight": rounded(weight, i, 1),
+            "body_fat": rounded(body_fat, i, 1),
+            "weight_smoothed": rounded(weight_smoothed, i),
+            "bf_smoothed": rounded(bf_smoothed, i),
+            "weight_rate_per_week": rounded(weight_rate, i),
+            "bf_rate_per_week": rounded(bf_rate, i),
+            "bf_fit": rounded(fitted, i),
+            "bf_lower": rounded(fitted - band, i),
+            "bf_upper": rounded(fitted + band, i),
+        }
+        for i, m in enumerate(metrics)
+    ]
+
+    start_date = metric_day(metrics[0])
+    summary = {
+        "entries": len(metrics),
+        "current_weight": round(float(weight_smoothed[-1]), 1),
+        "current_bf": round(float(bf_smoothed[-1]), 1),
+        "weight_rate_per_week": round(float(weight_rate[-1]), 2),
+        "bf_rate_per_week": round(float(bf_rate[-1]), 2),
+        "goal_bf": goal,
+        "bf_slope_per_week": round(fit["slope"] * 7, 3) if fit else None,
+        "bf_slope_ci_per_week": [
+            round((fit["slope"] - Z_95 * fit["slope_se"]) * 7, 3),
+            round((fit["slope"] + Z_95 * fit["slope_se"]) * 7, 3)
+        ] if fit else None,
+        **(goal_eta(fit, float(days[-1]), start_date, goal) if fit else
+           {"eta_date": None, "eta_earliest": None, "eta_latest": None, "on_track": False}),
+    }
+    return {"series": series, "summary": summary}
+
+
+# ==================== NAVY BODY FAT ====================
+
+# Bump when the formula below changes; stored rows with an older version get recomputed
+BODY_FAT_FORMULA_VERSION = 1
+DEFAULT_HEIGHT_INCHES = 75.0
+
+
+def navy_body_fat(waist, neck, height) -> np.ndarray:
+    """Navy method body fat % (inches) for scalars or whole arrays at once.
+
+    Rows where waist <= neck or height <= 0 come back as NaN.
+    """
+    waist, neck, height = np.broadcast_arrays(
+        np.asarray(waist, dtype=float), np.asarray(neck, dtype=float), np.asarray(height, dtype=float)
+    )
+    girth = waist - neck
+    valid = (girth > 0) & (height > 0)
+    bf = 86.010 * np.log10(np.where(valid, girth, 1.0)) - 70.041 * np.log10(np.where(valid, height, 1.0)) + 36.76
+    return np.where(valid, np.round(np.clip(bf, 0, 100), 1), np.nan)
+
+
+def recompute_body_fat(rows: List[Dict[str, Any]], height: float) -> List[Optional[float]]:
+    """Body fat for every metric row ({waist, neck}) at the given height; None where not computable"""
+    if not rows:
+        return []
+    waist = np.array([r.get("waist", 0) or 0 for r in rows], dtype=float)
+    neck = np.array([r.get("neck", 0) or 0 for r in rows], dtype=float)
+    values = navy_body_fat(waist, neck, height)
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+# ==================== ADAPTIVE TDEE ====================
+
+KCAL_PER_LB = 3500.0
+WEIGHT_NOISE_LB = 1.5            # Day-to-day scale noise (water, gut content)
+WEIGHT_DRIFT_LB = 0.2            # Daily process noise on the weight trend
+UNLOGGED_DAY_DRIFT_LB = 1.0      # Extra drift when the day's intake wasn't logged
+TDEE_DRIFT_KCAL = 15.0           # Daily random walk of true expenditure
+PARTIAL_LOG_FRACTION = 0.5       # Intake below this share of TDEE is taken as a partly logged day
+INITIAL_TDEE_SD_KCAL = 500.0
+
+
+class TdeeEstimator:
+    """Two-state Kalman filter over [weight trend (lb), TDEE (kcal/day)].
+
+    Each day is a predict step: the trend moves by (intake - TDEE) / 3500.
+    Each weigh-in is a measurement update. Both are O(1), so the state can
+    be persisted and advanced as data arrives instead of refitting history.
+    """
+
+    def __init__(self, x: np.ndarray, p: np.ndarray, last_date: str, observations: int = 0):
+        self.x = np.asarray(x, dtype=float)
+        self.p = np.asarray(p, dtype=float)
+        self.last_date = last_date
+        self.observations = observations
+
+    @classmethod
+    def start(cls, date: str, weight: float, tdee_guess: float) -> "TdeeEstimator":
+        return cls(
+            x=np.array([weight, tdee_guess]),
+            p=np.diag([WEIGHT_NOISE_LB ** 2, INITIAL_TDEE_SD_KCAL ** 2]),
+            last_date=date,
+            observations=1
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TdeeEstimator":
+        return cls(np.array(data["x"]), np.array(data["p"]), data["last_date"], data.get("observations", 0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "x": self.x.tolist(),
+            "p": self.p.tolist(),
+            "last_date": self.last_date,
+            "observations": self.observations
+        }
+
+    def predict_day(self, intake: Optional[float]) -> None:
+        """Advance one day given that day's logged intake (None if not logged)"""
+        if intake is None:
+            # Unknown energy balance: the trend may move either way, TDEE learns nothing
+            f = np.eye(2)
+            u = np.zeros(2)
+            q = np.diag([WEIGHT_DRIFT_LB ** 2 + UNLOGGED_DAY_DRIFT_LB ** 2, TDEE_DRIFT_KCAL ** 2])
+        else:
+            f = np.array([[1.0, -1.0 / KCAL_PER_LB], [0.0, 1.0]])
+            u = np.array([intake / KCAL_PER_LB, 0.0])
+            q = np.diag([WEIGHT_DRIFT_LB ** 2, TDEE_DRIFT_KCAL ** 2])
+        self.x = f @ self.x + u
+        self.p = f @ self.p @ f.T + q
+
+    def advance_to(self, date: str, intakes: Dict[str, float], complete_days: Collection[str] = ()) -> None:
+        """Predict forward from last_date to date, one step per elapsed day.
+
+        A day whose intake is below PARTIAL_LOG_FRACTION of the current TDEE
+        estimate counts as not logged unless it is in complete_days; treating a
+        half-logged day as the full intake would drag the TDEE estimate down.
+        """
+        current = datetime.strptime(self.last_date, "%Y-%m-%d")
+        target = datetime.strptime(date, "%Y-%m-%d")
+        while current < target:
+            day = current.strftime("%Y-%m-%d")
+            intake = intakes.get(day)
+            if intake is not None and day not in complete_days and intake < PARTIAL_LOG_FRACTION * self.x[1]:
+                intake = None
+            self.predict_day(intake)
+            current += timedelta(days=1)
+        self.last_date = max(self.last_date, date)
+
+    def observe(self, weight: float) -> None:
+        """Measurement update with a weigh-in"""
+        h = np.array([1.0, 0.0])
+        innovation = weight - h @ self.x
+        s = h @ self.p @ h + WEIGHT_NOISE_LB ** 2
+        k = self.p @ h / s
+        self.x = self.x + k * innovation
+        self.p = (np.eye(2) - np.outer(k, h)) @ self.p
+        self.observations += 1
+
+    def summary(self, deficit: float = 500.0) -> Dict[str, Any]:
+        tdee = float(self.x[1])
+        tdee_sd = float(np.sqrt(max(self.p[1, 1], 0.0)))
+        target = tdee - deficit
+        return {
+            "tdee": round(tdee),
+            "tdee_sd": round(tdee_sd),
+            "tdee_range": [round(tdee - Z_95 * tdee_sd), round(tdee + Z_95 * tdee_sd)],
+            "weight_trend": round(float(self.x[0]), 1),
+            "deficit": deficit,
+            "recommended_calorie_target": int(round(target, -1)),
+            "recommended_range": [int(round(target - Z_95 * tdee_sd, -1)), int(round(target + Z_95 * tdee_sd, -1))],
+            "last_date": self.last_date,
+            "observations": self.observations
+        }
+
+
+# ==================== MONTE CARLO PROJECTION ====================
+
+FAT_FRACTION_OF_LOSS = 0.75       # Share of weight lost that is fat in a moderate deficit
+ADAPTATION_KCAL_PER_LB = 10.0     # Expenditure drop per lb lost (metabolic adaptation)
+ADHERENCE_SD = 0.2                # Spread of achieved vs planned deficit across trajectories
+DEFAULT_WEEKLY_BF_SD = 0.3        # Used when history is too short to estimate noise
+PROJECTION_PERCENTILES = [10, 25, 50, 75, 90]
+
+
+def weekly_bf_noise(metrics: List[Dict[str, Any]]) -> float:
+    """Std dev of week-scaled body-fat changes around their mean, from the observed history (oldest first)"""
+    if len(metrics) < 3:
+        return DEFAULT_WEEKLY_BF_SD
+    days = metric_days(metrics)
+    body_fat = np.array([m.get("body_fat", 0) for m in metrics], dtype=float)
+    gaps = np.diff(days)
+    keep = gaps > 0
+    if keep.sum() < 2:
+        return DEFAULT_WEEKLY_BF_SD
+    # Scale each change to a 7-day step (random-walk variance grows with the gap)
+    weekly_changes = np.diff(body_fat)[keep] * np.sqrt(7.0 / gaps[keep])
+    return float(np.std(weekly_changes - weekly_changes.mean(), ddof=1))
+
+
+def row_percentiles(values: np.ndarray, percentiles: List[int]) -> np.ndarray:
+    """Nearest-rank percentiles along axis 1 via one partition (cheaper than a full sort)"""
+    n = values.shape[1]
+    ranks = [int(round(p / 100.0 * (n - 1))) for p in percentiles]
+    return np.partition(values, ranks, axis=1)[:, ranks]
+
+
+def project_body_fat(weight: float, body_fat: float, deficit: float, weekly_sd: float, weeks: int,
+                     samples: int, start_date: datetime, goal: float = BODY_FAT_GOAL,
+                     seed: Optional[int] = None) -> Dict[str, Any]:
+    """Simulate `samples` body-fat trajectories over `weeks` with no Python loop over samples or weeks.
+
+    Each trajectory draws its own adherence (achieved share of the planned deficit).
+    Cumulative weight loss follows the closed form of a deficit that shrinks with
+    adaptation, and a random walk with the observed weekly noise sits on top.
+    Arrays are laid out (weeks, samples) so per-week percentiles read contiguous rows.
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(1, weeks + 1, dtype=np.float32)[:, None]                     # (weeks, 1)
+    adherence = np.clip(rng.normal(1.0, ADHERENCE_SD, size=samples), 0.0, None).astype(np.float32)
+    effective_deficit = deficit * adherence                                     # (samples,)
+
+    # d(lost)/dt = 7 * (D - a * lost) / 3500  =>  lost(t) = D/a * (1 - exp(-7 a t / 3500))
+    decay = 1.0 - np.exp(-7.0 * ADAPTATION_KCAL_PER_LB * t / KCAL_PER_LB)
+    lost = np.minimum(effective_deficit / ADAPTATION_KCAL_PER_LB * decay, weight * 0.5)  # (weeks, samples)
+
+    fat0 = weight * body_fat / 100.0
+    bf = np.maximum(fat0 - FAT_FRACTION_OF_LOSS * lost, 0.0) / (weight - lost) * 100.0
+    noise = rng.standard_normal((weeks, samples), dtype=np.float32)
+    noise *= weekly_sd
+    bf += np.cumsum(noise, axis=0)
+    np.clip(bf, 3.0, 60.0, out=bf)
+
+    bands = row_percentiles(bf, PROJECTION_PERCENTILES)                        # (weeks, percentiles)
+    reached = bf <= goal
+    hit = reached.any(axis=0)
+    first_week = reached.argmax(axis=0)[hit] + 1
+
+    def week_date(week: float) -> str:
+        return (start_date + timedelta(weeks=float(week))).strftime("%Y-%m-%d")
+
+    goal_weeks = {}
+    if first_week.size:
+        for pct, value in zip(PROJECTION_PERCENTILES, np.percentile(first_week, PROJECTION_PERCENTILES)):
+            goal_weeks[f"p{pct}"] = week_date(value)
+
+    return {
+        "series": [
+            {"week": w + 1, "date": week_date(w + 1),
+             **{f"p{pct}": round(float(bands[w, i]), 2) for i, pct in enumerate(PROJECTION_PERCENTILES)}}
+            for w in range(weeks)
+        ],
+        "goal_bf": goal,
+        "probability_reach_goal": round(float(hit.mean()), 3),
+        "goal_date_percentiles": goal_weeks,
+        "weekly_bf_sd": round(weekly_sd, 3),
+        "samples": samples,
+        "weeks": weeks
+    }
+
+
+# ==================== DOWNSAMPLING ====================
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that keep the series' visual shape.
+
+    x must be sorted ascending. First and last points are always kept.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1])
+
+    # Bucket edges for the n-2 interior points, shared by the area and average steps
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point for the final bucket)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        # Triangle areas for every candidate in this bucket at once
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
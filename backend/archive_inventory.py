@@ -0,0 +1,55 @@
+"""Move expired items out of the inventory collection.
+
+Rows whose expiry_date is more than --grace-days in the past are copied to
+inventory_archive (stamped with archived_date) and then removed from
+inventory, so everyday inventory reads only see live stock. Rows are upserted
+into the archive by _id before being deleted, so a run that dies half-way can
+simply be run again without losing or duplicating anything. Meant to run
+daily from cron.
+
+Usage (from backend/):
+    python archive_inventory.py
+    python archive_inventory.py --grace-days 7 --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import datetime
+
+from pymongo import ReplaceOne
+
+from server import bump_inventory_version, client, db
+from inventory import add_days
+
+logger = logging.getLogger("archive_inventory")
+
+
+async def main(args) -> int:
+    today = datetime.now().strftime("%Y-%m-%d")
+    cutoff = add_days(today, -max(0, args.grace_days))
+    try:
+        expired = await db.inventory.find({"expiry_date": {"$ne": None, "$lt": cutoff}}).to_list(None)
+        if args.dry_run:
+            for row in expired:
+                logger.info(f"Would archive {row['item']} (expired {row['expiry_date']})")
+        elif expired:
+            await db.inventory_archive.bulk_write([
+                ReplaceOne({"_id": row["_id"]}, {**row, "archived_date": today}, upsert=True) for row in expired
+            ])
+            await db.inventory.delete_many({"_id": {"$in": [row["_id"] for row in expired]}})
+            await bump_inventory_version()
+    finally:
+        client.close()
+
+    logger.info(f"{'Found' if args.dry_run else 'Archived'} {len(expired)} items expired before {cutoff}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive expired inventory items")
+    parser.add_argument("--grace-days", type=int, default=0, help="Keep items this many days past expiry (default 0)")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be archived")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,140 @@
+# Inventory expiry defaults and run-out forecasting against the meal plan
+#
+# Each (item, unit dimension) pair becomes one row of a day-by-day need
+# matrix, so the day stock runs out is a single cumulative sum compared
+# against what's on hand.
+
+from datetime import datetime, timedelta
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from quantities import QuantityTotal
+
+# Tolerance for float rounding when comparing cumulative need to stock
+EPSILON = 1e-9
+
+# Days an unopened item keeps after purchase, by shopping category
+CATEGORY_SHELF_LIFE_DAYS = {
+    "Protein": 3,
+    "Produce": 7,
+    "Dairy": 10,
+    "Pantry": 180,
+    "Frozen": 90,
+}
+DEFAULT_SHELF_LIFE_DAYS = 7
+
+# Items that keep noticeably shorter or longer than their category
+ITEM_SHELF_LIFE_DAYS = {
+    "Eggs": 28,
+    "Unsweetened Almond Milk": 7,
+    "Fresh Spinach": 5,
+    "Mixed Greens": 5,
+    "Lettuce": 5,
+    "Mixed Berries": 4,
+    "Avocado": 4,
+    "Onion": 30,
+    "Sweet Potatoes": 21,
+    "Hummus": 7,
+    "Sliced Turkey Breast": 5,
+}
+
+
+def shelf_life_days(item: str, category: str) -> int:
+    return ITEM_SHELF_LIFE_DAYS.get(item, CATEGORY_SHELF_LIFE_DAYS.get(category, DEFAULT_SHELF_LIFE_DAYS))
+
+
+def add_days(date: str, days: int) -> str:
+    return (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def default_expiry(item: str, category: str, purchased_date: str) -> str:
+    """Expiry date for a newly purchased item"""
+    return add_days(purchased_date, shelf_life_days(item, category))
+
+
+def plan_days(start: str, end: str) -> List[str]:
+    """Every date from start to end inclusive"""
+    first = datetime.strptime(start, "%Y-%m-%d")
+    count = (datetime.strptime(end, "%Y-%m-%d") - first).days + 1
+    return [(first + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(max(count, 0))]
+
+
+def runout_indices(daily_need: np.ndarray, on_hand: np.ndarray) -> np.ndarray:
+    """First day index where cumulative need exceeds stock for each row, -1 if it never does"""
+    if daily_need.size == 0:
+        return np.full(len(on_hand), -1)
+    short = np.cumsum(daily_need, axis=1) > on_hand[:, None] + EPSILON
+    return np.where(short.any(axis=1), short.argmax(axis=1), -1)
+
+
+def forecast_inventory(
+    days: List[str],
+    needs: Dict[str, Dict[int, QuantityTotal]],
+    on_hand: Dict[str, QuantityTotal],
+    expiry_dates: Dict[str, Optional[str]]
+) -> List[Dict[str, Any]]:
+    """Run-out date, shortfall and expiry flags per item.
+
+    needs maps item -> {day index: amount needed that day}; on_hand and
+    expiry_dates are keyed by the same item names.
+    """
+    items = sorted(set(needs) | set(on_hand))
+    rows: List[Tuple[str, str]] = []
+    for item in items:
+        dimensions = set(on_hand.get(item, QuantityTotal()).amounts)
+        for day_need in needs.get(item, {}).values():
+            dimensions.update(day_need.amounts)
+        rows.extend((item, dimension) for dimension in sorted(dimensions))
+
+    daily_need = np.zeros((len(rows), len(days)))
+    stock = np.zeros(len(rows))
+    for r, (item, dimension) in enumerate(rows):
+        stock[r] = float(on_hand.get(item, QuantityTotal()).amounts.get(dimension, 0))
+        for day, day_need in needs.get(item, {}).items():
+            daily_need[r, day] += float(day_need.amounts.get(dimension, 0))
+    runouts = runout_indices(daily_need, stock)
+    cumulative = np.cumsum(daily_need, axis=1)
+
+    forecast = []
+    for item in items:
+        item_rows = [r for r, (name, _) in enumerate(rows) if name == item]
+        item_runouts = [int(runouts[r]) for r in item_rows if runouts[r] >= 0]
+        runout = min(item_runouts) if item_runouts else None
+
+        total_need = QuantityTotal()
+        for day_need in needs.get(item, {}).values():
+            total_need.merge(day_need)
+        have = on_hand.get(item, QuantityTotal())
+        shortfall = total_need.minus(have)
+        shortfall.unparsed = []
+
+        expiry = expiry_dates.get(item)
+        expires_before_use = False
+        unused_at_expiry = QuantityTotal()
+        if expiry and days and expiry < days[-1]:
+            # Stock left on the expiry date that the plan still wants afterwards,
+            # or that the plan never gets to
+            expiry_index = int(np.searchsorted(days, expiry, side="right")) - 1
+            for r in item_rows:
+                used = cumulative[r, expiry_index] if expiry_index >= 0 else 0.0
+                left = stock[r] - used
+                if left > EPSILON:
+                    unused_at_expiry.amounts[rows[r][1]] = Fraction(left).limit_denominator(48)
+                    if daily_need[r, expiry_index + 1:].sum() > EPSILON:
+                        expires_before_use = True
+
+        forecast.append({
+            "item": item,
+            "on_hand": have.format(),
+            "needed": total_need.format(),
+            "runs_out_on": days[runout] if runout is not None else None,
+            "days_covered": runout if runout is not None else len(days),
+            "shortfall": shortfall.format() or None,
+            "expiry_date": expiry,
+            "expires_before_use": expires_before_use,
+            "unused_at_expiry": unused_at_expiry.format() or None
+        })
+    forecast.sort(key=lambda f: (f["runs_out_on"] is None, f["runs_out_on"] or "", f["item"]))
+    return forecast
@@ -0,0 +1,137 @@
+# Ingredient matching over the meal library
+#
+# Every distinct ingredient gets a bit in a shared vocabulary, so a meal's
+# requirements are one integer mask and the inventory is another. "Can I make
+# it" is a single AND/compare, and ranking the whole library by missing
+# ingredients is one vectorized popcount over the packed masks. An inverted
+# index (ingredient -> meal ids) answers "which meals use X" without a scan.
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+WORD_BITS = 64
+
+
+def ingredient_key(name: str) -> str:
+    """Normalised ingredient name used for matching"""
+    return " ".join(name.lower().split())
+
+
+class MealIndex:
+    """Ingredient vocabulary plus per-meal requirement bitmasks"""
+
+    def __init__(self, meals: Iterable[Dict[str, Any]] = ()):
+        self.vocabulary: Dict[str, int] = {}
+        self.items: List[str] = []
+        self.meals: List[Dict[str, Any]] = []
+        self.masks: List[int] = []
+        self.positions: Dict[str, int] = {}
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.words = np.zeros((0, 1), dtype=np.uint64)
+        for meal in meals:
+            self.add_meal(meal)
+
+    def bit(self, item: str) -> int:
+        """Bit position for an ingredient, growing the vocabulary if it is new"""
+        key = ingredient_key(item)
+        if key not in self.vocabulary:
+            self.vocabulary[key] = len(self.items)
+            self.items.append(item)
+        return self.vocabulary[key]
+
+    def add_meal(self, meal: Dict[str, Any]):
+        """Index a meal (replacing any earlier version with the same id)"""
+        mask = 0
+        for ing in meal.get("ingredients", []):
+            mask |= 1 << self.bit(ing["item"])
+        if meal["id"] in self.positions:
+            position = self.positions[meal["id"]]
+            for item in self.names(self.masks[position]):
+                self.postings[ingredient_key(item)].discard(meal["id"])
+            self.meals[position] = meal
+            self.masks[position] = mask
+        else:
+            self.positions[meal["id"]] = len(self.meals)
+            self.meals.append(meal)
+            self.masks.append(mask)
+        for ing in meal.get("ingredients", []):
+            self.postings[ingredient_key(ing["item"])].add(meal["id"])
+        self.words = np.array([self.to_words(m) for m in self.masks], dtype=np.uint64).reshape(len(self.masks), -1)
+
+    def word_count(self) -> int:
+        return max(1, -(-len(self.items) // WORD_BITS))
+
+    def to_words(self, mask: int) -> List[int]:
+        """Split an integer mask into 64-bit words (lowest bits first)"""
+        return [(mask >> (WORD_BITS * i)) & ((1 << WORD_BITS) - 1) for i in range(self.word_count())]
+
+    def mask_for(self, items: Iterable[str]) -> int:
+        """Mask of the known ingredients among items; unknown names can't satisfy any meal"""
+        mask = 0
+        for item in items:
+            position = self.vocabulary.get(ingredient_key(item))
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def can_make(self, meal_id: str, available: int) -> bool:
+        position = self.positions.get(meal_id)
+        return position is not None and self.masks[position] & ~available == 0
+
+    def names(self, mask: int) -> List[str]:
+        """Ingredient names for the set bits of a mask"""
+        return [self.items[i] for i in range(len(self.items)) if mask >> i & 1]
+
+    def rank(self, available: int, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every meal with its missing ingredients, fewest missing first"""
+        if not self.meals:
+            return []
+        have = np.array(self.to_words(available), dtype=np.uint64)
+        missing_counts = np.bitwise_count(self.words & ~have).sum(axis=1)
+        order = np.argsort(missing_counts, kind="stable")
+        ranked = []
+        for position in order:
+            meal = self.meals[position]
+            if category and meal.get("category") != category:
+                continue
+            missing = self.masks[position] & ~available
+            ranked.append({
+                "id": meal["id"],
+                "name": meal["name"],
+                "category": meal.get("category"),
+                "macros": meal.get("macros"),
+                "missing_count": int(missing_counts[position]),
+                "missing": self.names(missing),
+                "can_make": missing == 0
+            })
+        return ranked
+
+    def meals_using(self, item: str) -> Set[str]:
+        """Ids of meals that need an ingredient"""
+        return self.postings.get(ingredient_key(item), set())
+
+    def by_ingredients(self, items: Iterable[str], category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Meals using any of items, ranked by how many of them each meal uses"""
+        matched: Dict[str, List[str]] = defaultdict(list)
+        for item in {ingredient_key(item): item for item in items}.values():
+            for meal_id in self.meals_using(item):
+                matched[meal_id].append(item)
+        ranked = []
+        for meal_id, uses in matched.items():
+            meal = self.meals[self.positions[meal_id]]
+            if category and meal.get("category") != category:
+                continue
+            total = len(meal.get("ingredients", []))
+            ranked.append({
+                "id": meal_id,
+                "name": meal["name"],
+                "category": meal.get("category"),
+                "macros": meal.get("macros"),
+                "uses": uses,
+                "uses_count": len(uses),
+                "coverage": round(len(uses) / total, 2) if total else 0.0
+            })
+        ranked.sort(key=lambda m: (-m["uses_count"], -m["coverage"], m["id"]))
+        return ranked
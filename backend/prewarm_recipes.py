@@ -0,0 +1,86 @@
+"""Pre-warm the recipe cache for every library meal.
+
+Walks EXTENDED_MEAL_LIBRARY and runs each meal through generate_recipe for
+both serving modes, so stored records exist before any user opens a recipe.
+Meals that already have a stored record are skipped, so an interrupted run
+can simply be started again.
+
+Usage (from backend/):
+    python prewarm_recipes.py --concurrency 4
+    python prewarm_recipes.py --meal-ids b1 d2 --force
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+
+from fastapi import HTTPException
+
+from server import (
+    EXTENDED_MEAL_LIBRARY, RecipeRequest, ai_provider, client, db, generate_recipe
+)
+from recipes import recipe_key
+
+# Individual first: the family record then reuses its narrative without another AI call
+SERVING_MODES = ["individual", "family"]
+
+logger = logging.getLogger("prewarm_recipes")
+
+
+async def prewarm_meal(meal, servings_modes, force, semaphore, stats):
+    async with semaphore:
+        if force:
+            await db.recipes.delete_many({"meal_id": meal["id"], "servings": {"$in": servings_modes}})
+        for servings in servings_modes:
+            key = recipe_key(meal["id"], servings)
+            if await db.recipes.find_one({"_id": key}, {"_id": 1}):
+                stats["skipped"] += 1
+                continue
+            started = time.monotonic()
+            try:
+                result = await generate_recipe(RecipeRequest(
+                    meal_name=meal["name"],
+                    meal_blueprint=meal["blueprint"],
+                    category=meal["category"],
+                    servings=servings,
+                    meal_id=meal["id"]
+                ))
+            except HTTPException as e:
+                stats["failed"] += 1
+                logger.error(f"{key}: {e.detail}")
+                # Later modes depend on this one's narrative; retry on the next run
+                break
+            stats["generated"] += 1
+            source = "reused narrative" if result.get("cached") else "AI"
+            logger.info(f"{key}: stored ({source}, {time.monotonic() - started:.1f}s)")
+
+
+async def main(args) -> int:
+    meals = [meal for meals in EXTENDED_MEAL_LIBRARY.values() for meal in meals]
+    if args.meal_ids:
+        meals = [meal for meal in meals if meal["id"] in set(args.meal_ids)]
+    modes = [mode for mode in SERVING_MODES if mode in args.servings]
+
+    stats = {"generated": 0, "skipped": 0, "failed": 0}
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+    await ai_provider.startup()
+    try:
+        await asyncio.gather(*(prewarm_meal(meal, modes, args.force, semaphore, stats) for meal in meals))
+    finally:
+        await ai_provider.aclose()
+        client.close()
+
+    logger.info(f"Done: {stats['generated']} generated, {stats['skipped']} already cached, {stats['failed']} failed")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate and store recipes for every library meal")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max meals generated at once (default 4)")
+    parser.add_argument("--servings", nargs="+", choices=SERVING_MODES, default=SERVING_MODES)
+    parser.add_argument("--meal-ids", nargs="+", help="Only these meal ids (default: whole library)")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if a recipe is already stored")
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(asyncio.run(main(parser.parse_args())))
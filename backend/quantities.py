@@ -0,0 +1,267 @@
+# Quantity parsing and scaling for ingredient amounts
+#
+# Library amounts are short strings like "1/2 cup", "4oz", "2", "1 scoop" or
+# "2 medium". parse_quantity turns them into exact Fraction amounts with a
+# canonical unit so recipes can be scaled locally instead of asking the LLM.
+# QuantityTotal sums them per dimension (volume, weight, count, or a discrete
+# unit like "can") so shopping lists add up exactly across a whole plan.
+
+import math
+
+import re
+from dataclasses import dataclass
+from fractions import Fraction
+from typing import Any, Dict, List, Optional, Union
+
+# Alias -> canonical unit. "" is a bare count ("2" eggs).
+UNIT_ALIASES = {
+    "": "",
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "tbsp": "tbsp", "tbs": "tbsp", "tablespoon": "tbsp", "tablespoons": "tbsp",
+    "tsp": "tsp", "teaspoon": "tsp", "teaspoons": "tsp",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "g": "g", "gram": "g", "grams": "g",
+    "kg": "kg",
+    "ml": "ml",
+    "l": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "scoop": "scoop", "scoops": "scoop",
+    "can": "can", "cans": "can",
+    "jar": "jar", "jars": "jar",
+    "packet": "packet", "packets": "packet",
+    "package": "package", "packages": "package", "pkg": "package",
+    "bag": "bag", "bags": "bag",
+    "stalk": "stalk", "stalks": "stalk",
+    "clove": "clove", "cloves": "clove",
+    "slice": "slice", "slices": "slice",
+    "medium": "medium", "large": "large", "small": "small",
+    "dozen": "dozen",
+}
+
+# Units that pluralise with a trailing "s" when the amount is above one
+PLURAL_UNITS = {"cup", "lb", "scoop", "can", "jar", "packet", "package", "bag", "stalk", "clove", "slice"}
+
+# Canonical unit -> (dimension, size in the dimension's base unit). Volume is
+# counted in teaspoons and weight in ounces; units not listed here (cans,
+# scoops, "medium") are their own dimension and only add to themselves.
+UNIT_DIMENSIONS = {
+    "tsp": ("volume", Fraction(1)),
+    "tbsp": ("volume", Fraction(3)),
+    "cup": ("volume", Fraction(48)),
+    "ml": ("volume", Fraction(1000, 4929)),
+    "l": ("volume", Fraction(1000000, 4929)),
+    "oz": ("weight", Fraction(1)),
+    "lb": ("weight", Fraction(16)),
+    "g": ("weight", Fraction(1000, 28350)),
+    "kg": ("weight", Fraction(1000000, 28350)),
+    "": ("count", Fraction(1)),
+    "dozen": ("count", Fraction(12)),
+}
+
+# Display units per dimension, largest first, with the smallest amount worth showing in each
+DISPLAY_UNITS = {
+    "volume": [("cup", Fraction(1, 4)), ("tbsp", Fraction(1)), ("tsp", Fraction(0))],
+    "weight": [("lb", Fraction(1)), ("oz", Fraction(0))],
+    "count": [("", Fraction(0))],
+}
+
+# Ingredient -> (pack size in base units, dimension, singular, plural) for items bought in fixed packs
+PURCHASE_UNITS = {
+    "Eggs": (Fraction(12), "count", "dozen", "dozen"),
+    "Egg Whites": (Fraction(4 * 48), "volume", "carton (32 oz)", "cartons (32 oz)"),
+    "Unsweetened Almond Milk": (Fraction(8 * 48), "volume", "half-gallon carton", "half-gallon cartons"),
+    "Non-fat Greek Yogurt": (Fraction(4 * 48), "volume", "tub (32 oz)", "tubs (32 oz)"),
+    "Greek Yogurt": (Fraction(4 * 48), "volume", "tub (32 oz)", "tubs (32 oz)"),
+    "Rolled Oats": (Fraction(15 * 48), "volume", "canister (42 oz)", "canisters (42 oz)"),
+    "Whey Protein (Vanilla)": (Fraction(30), "scoop", "tub (30 scoops)", "tubs (30 scoops)"),
+}
+
+QUANTITY_PATTERN = re.compile(
+    r"^\s*(?:(?P<whole>\d+)\s+(?=\d+/\d+))?(?P<number>\d+/\d+|\d*\.\d+|\d+)\s*(?P<unit>[a-zA-Z]*)\.?\s*$"
+)
+
+
+@dataclass(frozen=True)
+class Quantity:
+    """An exact amount in a canonical unit"""
+    amount: Fraction
+    unit: str = ""
+
+    def scale(self, factor: Union[int, float, Fraction]) -> "Quantity":
+        return Quantity(self.amount * to_fraction(factor), self.unit)
+
+    def format(self) -> str:
+        number = format_number(self.amount)
+        if not self.unit:
+            return number
+        unit = self.unit
+        if unit in PLURAL_UNITS and self.amount > 1:
+            unit = "lbs" if unit == "lb" else f"{unit}s"
+        return f"{number} {unit}"
+
+    def dimension(self) -> str:
+        return UNIT_DIMENSIONS.get(self.unit, (self.unit, None))[0]
+
+    def base_amount(self) -> Fraction:
+        """Amount in the dimension's base unit (teaspoons, ounces, units)"""
+        return self.amount * UNIT_DIMENSIONS.get(self.unit, (self.unit, Fraction(1)))[1]
+
+
+def to_fraction(value: Union[int, float, str, Fraction]) -> Fraction:
+    """Exact fraction for a scale factor, snapping floats to a sane denominator"""
+    if isinstance(value, Fraction):
+        return value
+    if isinstance(value, float):
+        return Fraction(value).limit_denominator(64)
+    return Fraction(value)
+
+
+def format_number(value: Fraction) -> str:
+    """Render 3/2 as '1 1/2', 2 as '2', and awkward fractions as decimals"""
+    if value.denominator == 1:
+        return str(value.numerator)
+    if value.denominator in (2, 3, 4, 8):
+        whole, remainder = divmod(value.numerator, value.denominator)
+        fraction = f"{remainder}/{value.denominator}"
+        return f"{whole} {fraction}" if whole else fraction
+    return f"{float(value):.2f}".rstrip("0").rstrip(".")
+
+
+def parse_quantity(text: str) -> Optional[Quantity]:
+    """Parse '1/2 cup', '4oz', '1 1/2 tbsp', '2' or '3lbs'. Returns None if unparseable."""
+    if not text:
+        return None
+    match = QUANTITY_PATTERN.match(text)
+    if not match:
+        return None
+    unit = UNIT_ALIASES.get(match.group("unit").lower())
+    if unit is None:
+        return None
+    amount = Fraction(match.group("number"))
+    if match.group("whole"):
+        amount += int(match.group("whole"))
+    return Quantity(amount, unit)
+
+
+def parse_amounts(text: str) -> Optional[List[Quantity]]:
+    """Parse a compound amount like '10 cups + 2 tbsp'. Returns None if any part is unparseable."""
+    parts = [part for part in re.split(r"[+,]", text or "") if part.strip()]
+    quantities = [parse_quantity(part) for part in parts]
+    if not quantities or any(q is None for q in quantities):
+        return None
+    return quantities
+
+
+def display_quantity(dimension: str, base: Fraction) -> Quantity:
+    """Express a base amount in the largest display unit that reads cleanly"""
+    for unit, minimum in DISPLAY_UNITS.get(dimension, []):
+        amount = base / UNIT_DIMENSIONS[unit][1]
+        if amount >= minimum and amount.denominator in (1, 2, 3, 4, 8):
+            return Quantity(amount, unit)
+    if dimension in DISPLAY_UNITS:
+        unit = DISPLAY_UNITS[dimension][-1][0]
+        return Quantity(base / UNIT_DIMENSIONS[unit][1], unit)
+    return Quantity(base, dimension)
+
+
+class QuantityTotal:
+    """Exact running total of amounts in mixed units, kept per dimension"""
+
+    def __init__(self):
+        self.amounts: Dict[str, Fraction] = {}
+        self.unparsed: List[str] = []
+
+    @classmethod
+    def from_text(cls, text: str, times: Union[int, Fraction] = 1) -> "QuantityTotal":
+        total = cls()
+        total.add_text(text, times)
+        return total
+
+    def add(self, quantity: Quantity, times: Union[int, Fraction] = 1):
+        dimension = quantity.dimension()
+        self.amounts[dimension] = self.amounts.get(dimension, Fraction(0)) + quantity.base_amount() * times
+
+    def add_text(self, text: str, times: Union[int, Fraction] = 1):
+        """Add an amount string; unparseable text ('to taste') is kept once, verbatim"""
+        quantities = parse_amounts(text)
+        if quantities is None:
+            if text and text not in self.unparsed:
+                self.unparsed.append(text)
+            return
+        for quantity in quantities:
+            self.add(quantity, times)
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, str]) -> "QuantityTotal":
+        total = cls()
+        total.amounts = {dimension: Fraction(amount) for dimension, amount in doc.items()}
+        return total
+
+    def to_doc(self) -> Optional[Dict[str, str]]:
+        """Exact per-dimension amounts as fraction strings for Mongo, or None if anything is unparsed"""
+        if self.unparsed:
+            return None
+        return {dimension: str(amount) for dimension, amount in self.amounts.items()}
+
+    def merge(self, other: "QuantityTotal"):
+        for dimension, amount in other.amounts.items():
+            self.amounts[dimension] = self.amounts.get(dimension, Fraction(0)) + amount
+        self.unparsed.extend(text for text in other.unparsed if text not in self.unparsed)
+
+    def minus(self, other: "QuantityTotal") -> "QuantityTotal":
+        """What is left of this total after other is used up, floored at zero per dimension"""
+        result = QuantityTotal()
+        for dimension, amount in self.amounts.items():
+            left = amount - other.amounts.get(dimension, Fraction(0))
+            if left > 0:
+                result.amounts[dimension] = left
+        result.unparsed = [text for text in self.unparsed if text not in other.unparsed]
+        return result
+
+    def is_empty(self) -> bool:
+        return not self.unparsed and all(amount <= 0 for amount in self.amounts.values())
+
+    def quantities(self) -> List[Quantity]:
+        return [display_quantity(dimension, amount) for dimension, amount in self.amounts.items() if amount > 0]
+
+    def format(self) -> str:
+        return " + ".join([q.format() for q in self.quantities()] + self.unparsed)
+
+    def purchase(self, item: str) -> Optional[str]:
+        """Round the total up to what you'd actually buy (whole packs, whole lbs, whole items)"""
+        if self.unparsed or len(self.amounts) != 1:
+            return None
+        (dimension, amount), = self.amounts.items()
+        if amount <= 0:
+            return None
+        if item in PURCHASE_UNITS and PURCHASE_UNITS[item][1] == dimension:
+            size, _, singular, plural = PURCHASE_UNITS[item]
+            packs = math.ceil(amount / size)
+            return f"{packs} {singular if packs == 1 else plural}"
+        if dimension == "weight" and amount >= 16:
+            return Quantity(Fraction(math.ceil(amount / 16)), "lb").format()
+        if dimension not in DISPLAY_UNITS or dimension == "count":
+            return display_quantity(dimension, Fraction(math.ceil(amount))).format()
+        return None
+
+
+def scale_amount(text: str, factor: Union[int, float, Fraction]) -> str:
+    """Scale an amount string; unparseable amounts ('to taste') are returned as-is"""
+    quantity = parse_quantity(text)
+    if quantity is None:
+        return text
+    return quantity.scale(factor).format()
+
+
+def scale_ingredients(ingredients: List[Dict[str, Any]], factor: Union[int, float, Fraction]) -> List[Dict[str, Any]]:
+    """Scale a library ingredient list ({item, amount, category}) by a serving factor"""
+    scaled = []
+    for ingredient in ingredients:
+        quantity = parse_quantity(ingredient.get("amount", ""))
+        scaled.append({
+            **ingredient,
+            "amount": quantity.scale(factor).format() if quantity else ingredient.get("amount", ""),
+            "base_amount": ingredient.get("amount", ""),
+            "scaled": quantity is not None
+        })
+    return scaled
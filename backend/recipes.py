@@ -0,0 +1,168 @@
+# Structured recipe records parsed from AI markdown
+#
+# generate_recipe asks the model for fixed sections (Ingredients, Prep
+# Instructions, Macros Per Serving, Meal Prep Tips, Family Modifications).
+# parse_recipe_markdown turns that markdown into a dict that is stored in the
+# `recipes` collection, keyed by meal_id + servings, so later views never
+# re-run the LLM.
+
+import re
+from typing import Any, Dict, List, Optional
+
+# Section heading keyword -> structured field
+SECTION_KEYWORDS = [
+    ("ingredient", "ingredients"),
+    ("instruction", "steps"),
+    ("step", "steps"),
+    ("method", "steps"),
+    ("direction", "steps"),
+    ("macro", "macros"),
+    ("nutrition", "macros"),
+    ("tip", "prep_tips"),
+    ("storage", "prep_tips"),
+    ("family", "family_modifications"),
+    ("modification", "family_modifications"),
+]
+
+HEADING_PATTERN = re.compile(
+    r"^\s*(?:#{1,6}\s*)?(?:\d+\.\s*)?\*{0,2}\s*([A-Za-z][A-Za-z /&-]{2,60}?)\s*\*{0,2}\s*(?:\(.*\))?\s*:?\s*\*{0,2}\s*$"
+)
+LIST_ITEM_PATTERN = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+(.*)$")
+UNITS = (
+    r"cups?|tbsp|tablespoons?|tsp|teaspoons?|oz|ounces?|lbs?|pounds?|g|grams?|kg|ml|l|scoops?|"
+    r"cans?|jars?|packets?|packages?|bags?|stalks?|cloves?|slices?|pieces?|medium|large|small|pinch|dash"
+)
+AMOUNT_PATTERN = re.compile(
+    r"^((?:\d+\s+)?\d+(?:[./]\d+)?\s*(?:-\s*\d+(?:[./]\d+)?)?\s*"
+    rf"(?:{UNITS})?\.?)\s+(.+)$",
+    re.IGNORECASE
+)
+# An ingredient amount inside free text ("stir in 2 cups of oats")
+QUANTITY_IN_TEXT_PATTERN = re.compile(rf"\b\d+(?:[./]\d+)?\s*(?:{UNITS})\b", re.IGNORECASE)
+MACRO_PATTERNS = {
+    "calories": [r"(\d+(?:\.\d+)?)\s*(?:k?cal|calories)\b", r"calories?\s*[:\-]?\s*~?(\d+(?:\.\d+)?)"],
+    "protein": [r"protein\s*[:\-]?\s*~?(\d+(?:\.\d+)?)\s*g", r"(\d+(?:\.\d+)?)\s*g\s*(?:of\s+)?protein"],
+    "carbs": [r"carb(?:ohydrate)?s?\s*[:\-]?\s*~?(\d+(?:\.\d+)?)\s*g", r"(\d+(?:\.\d+)?)\s*g\s*(?:of\s+)?carb"],
+    "fat": [r"\bfats?\s*[:\-]?\s*~?(\d+(?:\.\d+)?)\s*g", r"(\d+(?:\.\d+)?)\s*g\s*(?:of\s+)?fat\b"],
+}
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"\*{1,2}|__", "", text).strip()
+
+
+def _section_for(heading: str) -> Optional[str]:
+    lowered = heading.lower()
+    for keyword, field in SECTION_KEYWORDS:
+        if keyword in lowered:
+            return field
+    return None
+
+
+def parse_ingredient_line(line: str) -> Dict[str, str]:
+    """Split '1/2 cup Rolled Oats' / 'Rolled Oats: 1/2 cup' into item and amount"""
+    text = _clean(line)
+    if ":" in text:
+        item, amount = (part.strip() for part in text.split(":", 1))
+        if AMOUNT_PATTERN.match(f"{amount} x") or re.match(r"^\d", amount):
+            return {"item": item, "amount": amount, "text": text}
+    match = AMOUNT_PATTERN.match(text)
+    if match:
+        return {"item": match.group(2).strip(), "amount": match.group(1).strip(), "text": text}
+    return {"item": text, "amount": "", "text": text}
+
+
+def parse_macros(text: str) -> Dict[str, Optional[float]]:
+    """Pull calories/protein/carbs/fat numbers out of free text"""
+    lowered = _clean(text).lower()
+    macros: Dict[str, Optional[float]] = {}
+    for name, patterns in MACRO_PATTERNS.items():
+        value = None
+        for pattern in patterns:
+            match = re.search(pattern, lowered)
+            if match:
+                value = float(match.group(1))
+                break
+        macros[name] = int(value) if value is not None and value.is_integer() else value
+    return macros
+
+
+def parse_recipe_markdown(markdown: str) -> Dict[str, Any]:
+    """Parse the AI recipe markdown into ingredients, steps, macros and notes"""
+    sections: Dict[str, List[str]] = {
+        "ingredients": [], "steps": [], "macros": [], "prep_tips": [], "family_modifications": []
+    }
+    current: Optional[str] = None
+
+    for raw_line in markdown.splitlines():
+        line = raw_line.rstrip()
+        if not line.strip():
+            continue
+        heading = HEADING_PATTERN.match(line)
+        is_list_item = LIST_ITEM_PATTERN.match(line)
+        # Numbered bold headings ("1. **Ingredients**") look like list items too
+        if heading and (not is_list_item or "**" in line or line.lstrip().startswith("#")):
+            field = _section_for(heading.group(1))
+            if field:
+                current = field
+                continue
+        if current is None:
+            continue
+        content = is_list_item.group(1) if is_list_item else line
+        content = _clean(content)
+        if content:
+            sections[current].append(content)
+
+    macros_text = "\n".join(sections["macros"])
+    return {
+        "ingredients": [parse_ingredient_line(line) for line in sections["ingredients"]],
+        "steps": sections["steps"],
+        "macros": parse_macros(macros_text),
+        "prep_tips": sections["prep_tips"],
+        "family_modifications": sections["family_modifications"],
+    }
+
+
+def serving_free_narrative(structured: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Steps, macros and notes of a stored record that hold no ingredient amounts, so they read
+    the same at any serving size. None if the steps themselves quote amounts."""
+    def quantity_free(lines: List[str]) -> bool:
+        return not any(QUANTITY_IN_TEXT_PATTERN.search(line) for line in lines)
+
+    if not quantity_free(structured.get("steps", [])):
+        return None
+    return {
+        "steps": structured.get("steps", []),
+        "macros": structured.get("macros", {}),
+        "prep_tips": structured.get("prep_tips", []) if quantity_free(structured.get("prep_tips", [])) else [],
+        "family_modifications": (
+            structured.get("family_modifications", [])
+            if quantity_free(structured.get("family_modifications", [])) else []
+        ),
+    }
+
+
+def recipe_key(meal_id: str, servings: str) -> str:
+    """Mongo _id for a stored recipe record"""
+    return f"{meal_id}:{servings}"
+
+
+def render_recipe_markdown(structured: Dict[str, Any], title: str, serving_text: str) -> str:
+    """Rebuild display markdown from a structured record (used when only quantities changed)"""
+    lines = [f"# {title}", f"*{serving_text}*", "", "**Ingredients**"]
+    lines += ["- " + " ".join(filter(None, [ing.get("amount"), ing["item"]])) for ing in structured.get("ingredients", [])]
+    lines += ["", "**Prep Instructions**"]
+    lines += [f"{i}. {step}" for i, step in enumerate(structured.get("steps", []), start=1)]
+    macros = structured.get("macros", {})
+    lines += [
+        "", "**Macros Per Serving**",
+        f"- Calories: {macros.get('calories', 'N/A')}",
+        f"- Protein: {macros.get('protein', 'N/A')}g",
+        f"- Carbs: {macros.get('carbs', 'N/A')}g",
+        f"- Fat: {macros.get('fat', 'N/A')}g",
+    ]
+    if structured.get("prep_tips"):
+        lines += ["", "**Meal Prep Tips**"] + [f"- {tip}" for tip in structured["prep_tips"]]
+    if structured.get("family_modifications"):
+        lines += ["", "**Family Modifications**"] + [f"- {note}" for note in structured["family_modifications"]]
+    return "\n".join(lines)
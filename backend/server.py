@@ -1,17 +1,35 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import InsertOne, UpdateOne, ReplaceOne, DeleteOne, ReturnDocument
+from bson import ObjectId
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any, Set
 from datetime import datetime, timezone, timedelta
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from fastapi.responses import StreamingResponse
 import math
+import numpy as np
+import hashlib
+import json
 from collections import defaultdict
 from meal_data import EXTENDED_MEAL_LIBRARY, SHOPPING_CATEGORIES, PREP_DAYS
+from ai_providers import provider_from_env
+from recipes import parse_recipe_markdown, recipe_key, render_recipe_markdown, serving_free_narrative
+from quantities import scale_ingredients, QuantityTotal
+from meal_index import MealIndex, ingredient_key
+from inventory import plan_days, forecast_inventory, default_expiry, add_days
+from training import (
+    ACUTE_DAYS, CHRONIC_DAYS, day_load_doc, window_start, acwr_status, history_days, muscle_group_seed
+)
+from analytics import (
+    metrics_trend, navy_body_fat, recompute_body_fat, BODY_FAT_FORMULA_VERSION, DEFAULT_HEIGHT_INCHES,
+    TdeeEstimator, weekly_bf_noise, project_body_fat, lttb_indices, metric_day
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -30,6 +48,9 @@ api_router = APIRouter(prefix="/api")
 # Get Emergent LLM Key
 EMERGENT_LLM_KEY = os.environ.get('EMERGENT_LLM_KEY', '')
 
+# AI provider (AI_PROVIDER=emergent|fake); started on startup, closed on shutdown
+ai_provider = provider_from_env(EMERGENT_LLM_KEY)
+
 # ==================== MODELS ====================
 
 class HabitEntry(BaseModel):
@@ -66,6 +87,7 @@ class UserSettings(BaseModel):
     protein_current: int = 0
     calorie_target: int = 2400  # NEW: Daily calorie target
     calorie_current: int = 0     # NEW: Calories consumed today
+    height_inches: Optional[float] = None  # Used for Navy body fat; unchanged when omitted
     water_liters: float = 0.0
     alcohol_count: int = 0
     selected_meals: Dict[str, Any] = {}
@@ -83,8 +105,9 @@ class RecipeRequest(BaseModel):
     meal_name: str
     meal_blueprint: str
     category: str
-    servings: str = "individual"  # "individual" or "family"
+    servings: str = "individual"  # "individual", "family" or a number of servings
     meal_id: Optional[str] = None
+    regenerate: bool = False  # Ignore the stored recipe and call the AI again
 
 # ==================== NEW MEAL PLANNING MODELS ====================
 
@@ -96,14 +119,17 @@ class MealPlanEntry(BaseModel):
     meal_name: str
     is_prepped: bool = False
     prep_date: Optional[str] = None
+    expiry_date: Optional[str] = None
 
 class ShoppingListItem(BaseModel):
     model_config = ConfigDict(extra="ignore")
+    id: Optional[str] = None  # stable per ingredient, see shopping_item_id
     item: str
     amount: str
     category: str
     purchased: bool = False
     meal_ids: List[str] = []
+    purchase_amount: Optional[str] = None
 
 class InventoryItem(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -141,6 +167,10 @@ class WorkoutSet(BaseModel):
     weight: float
     notes: Optional[str] = None
 
+class MuscleGroupMapping(BaseModel):
+    exercise: str
+    muscle_group: str
+
 class WorkoutEntry(BaseModel):
     model_config = ConfigDict(extra="ignore")
     date: str  # YYYY-MM-DD
@@ -160,6 +190,10 @@ MEAL_LIBRARY = {
     for category, meals in EXTENDED_MEAL_LIBRARY.items()
 }
 
+# Meal lookup by id across all categories
+MEALS_BY_ID = {meal["id"]: meal for meals in EXTENDED_MEAL_LIBRARY.values() for meal in meals}
+MEAL_INDEX = MealIndex(MEALS_BY_ID.values())
+
 # ==================== SUPPLEMENT DEFAULTS ====================
 
 DEFAULT_SUPPS = [
@@ -183,35 +217,133 @@ BEAST_SCHEDULE = [
 
 # ==================== HELPER FUNCTIONS ====================
 
-def calculate_body_fat_navy(waist: float, neck: float, height: float = 75.0) -> float:
-    """Calculate body fat % using Navy method. Default height 75 inches (6'3")"""
-    bf = (86.010 * math.log10(waist - neck) - 70.041 * math.log10(height) + 36.76)
-    return round(max(0, min(100, bf)), 1)
+def calculate_body_fat_navy(waist: float, neck: float, height: float = DEFAULT_HEIGHT_INCHES) -> Optional[float]:
+    """Calculate body fat % using Navy method. Default height 75 inches (6'3"). None if waist <= neck"""
+    bf = float(navy_body_fat(waist, neck, height))
+    return None if math.isnan(bf) else bf
+
+MIN_HEIGHT_INCHES = 36
+MAX_HEIGHT_INCHES = 96
+
+def validate_height(height_inches: float):
+    if not MIN_HEIGHT_INCHES <= height_inches <= MAX_HEIGHT_INCHES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Height must be between {MIN_HEIGHT_INCHES} and {MAX_HEIGHT_INCHES} inches"
+        )
+
+async def get_height_inches() -> float:
+    """User height from settings (inches); the default if unset or out of range"""
+    settings_doc = await db.settings.find_one({"_id": "user_settings"}, {"height_inches": 1})
+    height = (settings_doc or {}).get("height_inches")
+    if height is None or not MIN_HEIGHT_INCHES <= height <= MAX_HEIGHT_INCHES:
+        return DEFAULT_HEIGHT_INCHES
+    return height
+
+async def recompute_stored_body_fat(height: float, only_stale: bool = False) -> int:
+    """Recompute body fat for the metrics history in one vectorized pass and one bulk write"""
+    query = {"bf_formula_version": {"$ne": BODY_FAT_FORMULA_VERSION}} if only_stale else {}
+    rows = await db.metrics.find(query, {"_id": 1, "timestamp": 1, "waist": 1, "neck": 1}).to_list(None)
+    values = recompute_body_fat(rows, height)
+    ops = [
+        UpdateOne(
+            {"_id": row["_id"]},
+            {"$set": {"body_fat": bf, "bf_height": height, "bf_formula_version": BODY_FAT_FORMULA_VERSION}}
+        )
+        for row, bf in zip(rows, values) if bf is not None
+    ]
+    if not ops:
+        return 0
+    await db.metrics.bulk_write(ops, ordered=False)
+    await invalidate_weekly_summaries([timestamp_date(min(row["timestamp"] for row in rows))], carries_forward=True)
+    await invalidate_analytics("metrics")
+    return len(ops)
+
+def resolve_serving_count(meal_data: Optional[Dict[str, Any]], servings: str) -> float:
+    """Serving count for "individual", "family" or an explicit number of servings"""
+    if servings == "family":
+        return meal_data.get("family_servings", 4) if meal_data else 4
+    if servings == "individual":
+        return meal_data.get("dad_servings", 1) if meal_data else 1
+    try:
+        count = float(servings)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="servings must be 'individual', 'family' or a number")
+    if count <= 0:
+        raise HTTPException(status_code=400, detail="servings must be positive")
+    return int(count) if count.is_integer() else count
+
+def scaled_meal_ingredients(meal_data: Dict[str, Any], servings: str) -> List[Dict[str, Any]]:
+    """Library ingredients scaled locally from the base (individual) serving"""
+    factor = resolve_serving_count(meal_data, servings) / meal_data.get("dad_servings", 1)
+    return scale_ingredients(meal_data.get("ingredients", []), factor)
 
 async def get_ai_response(prompt: str, system_message: str) -> str:
-    """Get AI response using Emergent LLM Key with Gemini"""
-    if not EMERGENT_LLM_KEY:
+    """Get AI response from the configured provider (Gemini via Emergent LLM Key by default)"""
+    if not ai_provider.is_configured():
         raise HTTPException(status_code=500, detail="AI key not configured")
     
     try:
-        chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"beast-{datetime.now().timestamp()}",
-            system_message=system_message
-        ).with_model("gemini", "gemini-2.5-pro")
-        
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
-        return response
+        return await ai_provider.complete(prompt, system_message)
     except Exception as e:
         logging.error(f"AI Error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"AI service error: {str(e)}")
 
+def fingerprint(data: Any) -> str:
+    """Stable hash of JSON-serialisable data (key order independent)"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+async def get_cached_ai_response(cache_id: str, inputs: Dict[str, Any], prompt: str, system_message: str) -> Dict[str, Any]:
+    """Return the stored AI response for cache_id while `inputs` are unchanged; otherwise call the AI and store it"""
+    key = fingerprint({"inputs": inputs, "system": system_message})
+    cached = await db.ai_cache.find_one({"_id": cache_id})
+    if cached and cached.get("fingerprint") == key:
+        return {"response": cached["response"], "cached": True}
+    
+    response = await get_ai_response(prompt, system_message)
+    await db.ai_cache.update_one(
+        {"_id": cache_id},
+        {"$set": {"fingerprint": key, "response": response, "generated_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True
+    )
+    return {"response": response, "cached": False}
+
+# Cached analytics results (analytics_cache collection), tagged with the
+# collection they are derived from and dropped when it is written to
+analytics_generation: Dict[str, int] = defaultdict(int)
+
+async def invalidate_analytics(source: str):
+    """Drop cached analytics derived from `source` (e.g. "metrics")"""
+    analytics_generation[source] += 1
+    await db.analytics_cache.delete_many({"source": source})
+
+async def get_cached_analytics(cache_id: str, source: str, compute) -> Any:
+    """Return the cached result for cache_id, or await compute() and cache it"""
+    cached = await db.analytics_cache.find_one({"_id": cache_id})
+    if cached:
+        return cached["result"]
+    generation = analytics_generation[source]
+    result = await compute()
+    # Skip storing if the source was written while we were computing
+    if generation == analytics_generation[source]:
+        await db.analytics_cache.update_one(
+            {"_id": cache_id},
+            {"$set": {"source": source, "result": result, "computed_at": datetime.now(timezone.utc).isoformat()}},
+            upsert=True
+        )
+    return result
+
+def stream_ai_response(prompt: str, system_message: str) -> StreamingResponse:
+    """Stream the AI response token by token as plain text"""
+    if not ai_provider.is_configured():
+        raise HTTPException(status_code=500, detail="AI key not configured")
+    return StreamingResponse(ai_provider.stream(prompt, system_message), media_type="text/plain")
+
 # ==================== API ROUTES ====================
 
 @api_router.get("/")
 async def root():
-    return {"message": "Beast Transformation Hub API", "status": "online"}
+    return {"message": "Beast Transformation Hub API", "status": "online", "ai_provider": ai_provider.name}
 
 # ========== HABITS ==========
 
@@ -237,6 +369,7 @@ async def toggle_habit(entry: HabitEntry):
         {"$set": {"habits": habits}},
         upsert=True
     )
+    await invalidate_weekly_summaries([entry.date])
     
     return {"success": True, "date": entry.date, "completed": entry.completed}
 
@@ -274,19 +407,191 @@ async def get_streak():
 
 # ========== METRICS ==========
 
+MAX_CHART_POINTS = 2000
+
+def is_iso_date(value: Any) -> bool:
+    """True for a zero-padded YYYY-MM-DD string (the only date format that sorts and parses reliably)"""
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").strftime("%Y-%m-%d") == value
+    except (TypeError, ValueError):
+        return False
+
+def timestamp_date(timestamp: datetime) -> str:
+    """YYYY-MM-DD (UTC, like the frontend's day keys) of a timestamp; naive timestamps from Mongo are UTC"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc)
+    return timestamp.strftime("%Y-%m-%d")
+
+def row_date(row: Dict[str, Any]) -> datetime:
+    """Day of a row with a YYYY-MM-DD date (workouts)"""
+    return datetime.strptime(row["date"], "%Y-%m-%d")
+
+def downsample_rows(rows: List[Dict[str, Any]], y_field: str, points: int,
+                    day: Callable[[Dict[str, Any]], datetime] = row_date) -> List[Dict[str, Any]]:
+    """LTTB-downsample rows (sorted oldest first) on y_field, with day(row) as the x axis; returns the kept rows"""
+    if len(rows) <= points:
+        return rows
+    x = np.array([day(r).toordinal() for r in rows], dtype=float)
+    y = np.array([r.get(y_field, 0) or 0 for r in rows], dtype=float)
+    return [rows[i] for i in lttb_indices(x, y, points)]
+
 @api_router.get("/metrics", response_model=List[MetricEntry])
-async def get_metrics():
-    """Get all metric entries"""
-    metrics = await db.metrics.find({}, {"_id": 0}).sort("timestamp", -1).to_list(100)
-    return metrics
+async def get_metrics(points: Optional[int] = None, series: str = "weight"):
+    """Get all metric entries (latest 100), or the whole history downsampled to `points` on `series`"""
+    if points is None:
+        metrics = await db.metrics.find({}, {"_id": 0}).sort("timestamp", -1).to_list(100)
+        return metrics
+    if series not in ("weight", "body_fat"):
+        raise HTTPException(status_code=400, detail="series must be 'weight' or 'body_fat'")
+    points = max(3, min(MAX_CHART_POINTS, points))
+    
+    async def compute():
+        history = await load_metrics_history()
+        # Newest first, like the undownsampled response
+        return list(reversed(downsample_rows(history, series, points, day=metric_day)))
+    return await get_cached_analytics(f"lttb:metrics:{series}:{points}", "metrics", compute)
 
 @api_router.post("/metrics", response_model=MetricEntry)
 async def add_metric(entry: MetricEntry):
-    """Add a new metric entry"""
+    """Add a new metric entry (body fat recomputed server-side from waist/neck and stored height)"""
+    if not is_iso_date(entry.date):
+        # Older clients sent a locale date string (e.g. 10/19/2026); take the day from the timestamp
+        entry.date = timestamp_date(entry.timestamp)
+    height = await get_height_inches()
+    body_fat = calculate_body_fat_navy(entry.waist, entry.neck, height)
+    if body_fat is not None:
+        entry.body_fat = body_fat
     entry_dict = entry.model_dump()
+    if body_fat is not None:
+        entry_dict.update({"bf_height": height, "bf_formula_version": BODY_FAT_FORMULA_VERSION})
     await db.metrics.insert_one(entry_dict)
+    # Summaries place metrics by timestamp
+    await invalidate_weekly_summaries([timestamp_date(entry.timestamp)], carries_forward=True)
+    await invalidate_analytics("metrics")
+    try:
+        await update_tdee_estimate(entry.date, entry.weight)
+    except Exception as e:
+        # The metric is already stored; /tdee/rebuild can replay it later
+        logging.error(f"TDEE update failed for metric on {entry.date}: {str(e)}")
     return entry
 
+async def load_metrics_history() -> List[Dict[str, Any]]:
+    """Full metrics history, oldest first (by timestamp)"""
+    return await db.metrics.find({}, {"_id": 0}).sort("timestamp", 1).to_list(None)
+
+# ========== ADAPTIVE TDEE ==========
+
+# Rough maintenance guess used to seed the filter (kcal per lb of bodyweight)
+TDEE_SEED_KCAL_PER_LB = 15
+
+def complete_calorie_days(logs: List[Dict[str, Any]]) -> Set[str]:
+    """Days explicitly marked as fully logged"""
+    return {log["_id"] for log in logs if log.get("complete")}
+
+async def update_tdee_estimate(date: str, weight: float):
+    """Advance the persisted TDEE filter to `date` and apply the weigh-in (O(days since last weigh-in))"""
+    state_doc = await db.tdee_state.find_one({"_id": "user_tdee"})
+    if not state_doc:
+        estimator = TdeeEstimator.start(date, weight, weight * TDEE_SEED_KCAL_PER_LB)
+    else:
+        estimator = TdeeEstimator.from_dict(state_doc["state"])
+        if date < estimator.last_date:
+            # Backfilled weigh-in; folded in by /tdee/rebuild
+            return
+        logs = await db.calorie_log.find({"_id": {"$gte": estimator.last_date, "$lt": date}}).to_list(None)
+        estimator.advance_to(date, {log["_id"]: log["calories"] for log in logs}, complete_calorie_days(logs))
+        estimator.observe(weight)
+    await db.tdee_state.update_one({"_id": "user_tdee"}, {"$set": {"state": estimator.to_dict()}}, upsert=True)
+
+@api_router.get("/tdee")
+async def get_tdee(deficit: float = 500):
+    """Estimated TDEE from weight trend and logged calories, with a recommended daily target"""
+    state_doc = await db.tdee_state.find_one({"_id": "user_tdee"})
+    if not state_doc:
+        raise HTTPException(status_code=404, detail="No weight metrics logged yet")
+    return TdeeEstimator.from_dict(state_doc["state"]).summary(deficit)
+
+async def replay_tdee_history() -> Optional[TdeeEstimator]:
+    """Replay the full metrics and calorie history through a fresh filter and persist it; None without metrics"""
+    metrics, logs = await asyncio.gather(
+        db.metrics.find({}, {"_id": 0, "date": 1, "weight": 1}).sort([("date", 1), ("timestamp", 1)]).to_list(None),
+        db.calorie_log.find({}).to_list(None)
+    )
+    if not metrics:
+        await db.tdee_state.delete_one({"_id": "user_tdee"})
+        return None
+    intakes = {log["_id"]: log["calories"] for log in logs}
+    complete_days = complete_calorie_days(logs)
+    estimator = TdeeEstimator.start(metrics[0]["date"], metrics[0]["weight"], metrics[0]["weight"] * TDEE_SEED_KCAL_PER_LB)
+    for m in metrics[1:]:
+        estimator.advance_to(m["date"], intakes, complete_days)
+        estimator.observe(m["weight"])
+    await db.tdee_state.update_one({"_id": "user_tdee"}, {"$set": {"state": estimator.to_dict()}}, upsert=True)
+    return estimator
+
+@api_router.post("/tdee/rebuild")
+async def rebuild_tdee():
+    """Replay the full metrics and calorie history through a fresh filter (after backfilled data)"""
+    estimator = await replay_tdee_history()
+    if estimator is None:
+        raise HTTPException(status_code=404, detail="No weight metrics logged yet")
+    return estimator.summary()
+
+# ========== BODY FAT PROJECTION ==========
+
+MAX_PROJECTION_WEEKS = 260
+# Simulation cost is linear in samples (about 30 ms for 2000 over the default horizon)
+MAX_PROJECTION_SAMPLES = 2000
+
+@api_router.get("/projection")
+async def get_projection(deficit: Optional[float] = None, weeks: int = 209, samples: int = 2000, seed: Optional[int] = None):
+    """Monte Carlo body-fat projection toward 12%: weekly percentile bands over the horizon.
+    deficit defaults to estimated TDEE minus the calorie target (or 500 kcal without an estimate)."""
+    weeks = max(1, min(MAX_PROJECTION_WEEKS, weeks))
+    samples = max(100, min(MAX_PROJECTION_SAMPLES, samples))
+    
+    metrics, tdee_doc, settings_doc = await asyncio.gather(
+        db.metrics.find({}, {"_id": 0, "timestamp": 1, "weight": 1, "body_fat": 1})
+            .sort("timestamp", -1).to_list(60),
+        db.tdee_state.find_one({"_id": "user_tdee"}),
+        db.settings.find_one({"_id": "user_settings"})
+    )
+    if not metrics:
+        raise HTTPException(status_code=404, detail="No metrics logged yet")
+    metrics.reverse()
+    
+    if deficit is None:
+        deficit = 500.0
+        if tdee_doc:
+            calorie_target = settings_doc.get("calorie_target", 2400) if settings_doc else 2400
+            deficit = TdeeEstimator.from_dict(tdee_doc["state"]).summary()["tdee"] - calorie_target
+    
+    latest = metrics[-1]
+    projection = project_body_fat(
+        weight=latest["weight"],
+        body_fat=latest["body_fat"],
+        deficit=deficit,
+        weekly_sd=weekly_bf_noise(metrics),
+        weeks=weeks,
+        samples=samples,
+        start_date=metric_day(latest),
+        seed=seed
+    )
+    return {**projection, "deficit": deficit, "start_weight": latest["weight"], "start_bf": latest["body_fat"]}
+
+@api_router.post("/metrics/recompute-body-fat")
+async def recompute_metrics_body_fat():
+    """Recompute stored body fat for every metric with the current height and formula"""
+    updated = await recompute_stored_body_fat(await get_height_inches())
+    return {"success": True, "metrics_updated": updated}
+
+@api_router.get("/metrics/trend")
+async def get_metrics_trend():
+    """Smoothed weight/body fat, weekly rate of change, ETA to 12% body fat and confidence bands"""
+    async def compute():
+        return metrics_trend(await load_metrics_history())
+    return await get_cached_analytics("metrics_trend", "metrics", compute)
+
 # ========== USER SETTINGS ==========
 
 @api_router.get("/settings")
@@ -302,6 +607,7 @@ async def get_settings():
             "calorie_current": 0,
             "water_liters": 0.0,
             "alcohol_count": 0,
+            "height_inches": DEFAULT_HEIGHT_INCHES,
             "selected_meals": {
                 "breakfast": MEAL_LIBRARY["breakfast"][0],
                 "lunch": MEAL_LIBRARY["lunch"][0],
@@ -318,6 +624,7 @@ async def get_settings():
         "calorie_current": 0,
         "water_liters": 0.0,
         "alcohol_count": 0,
+        "height_inches": DEFAULT_HEIGHT_INCHES,
         "selected_meals": {
             "breakfast": MEAL_LIBRARY["breakfast"][0],
             "lunch": MEAL_LIBRARY["lunch"][0],
@@ -333,13 +640,33 @@ async def get_settings():
 async def update_settings(settings: UserSettings):
     """Update user settings"""
     settings_dict = settings.model_dump()
+    if settings_dict["height_inches"] is None:
+        settings_dict.pop("height_inches")
+    else:
+        validate_height(settings_dict["height_inches"])
+    previous_height = await get_height_inches()
     await db.settings.update_one(
         {"_id": "user_settings"},
         {"$set": settings_dict},
         upsert=True
     )
+    await invalidate_weekly_summaries()
+    if settings.height_inches and settings.height_inches != previous_height:
+        await recompute_stored_body_fat(settings.height_inches)
     return {"success": True}
 
+@api_router.post("/settings/height")
+async def set_height(height_inches: float):
+    """Set height (inches) and recompute body fat across the metrics history"""
+    validate_height(height_inches)
+    await db.settings.update_one(
+        {"_id": "user_settings"},
+        {"$set": {"height_inches": height_inches}},
+        upsert=True
+    )
+    updated = await recompute_stored_body_fat(height_inches)
+    return {"height_inches": height_inches, "metrics_updated": updated}
+
 @api_router.post("/settings/protein/add")
 async def add_protein(amount: int = 25):
     """Add protein (default 25g)"""
@@ -412,7 +739,7 @@ async def reset_weekly_counters():
 
 @api_router.post("/settings/calorie/add")
 async def add_calories(amount: int):
-    """Add calories consumed"""
+    """Add calories consumed (also logged per day for the TDEE estimator)"""
     settings_doc = await db.settings.find_one({"_id": "user_settings"})
     current = settings_doc.get("calorie_current", 0) if settings_doc else 0
     new_amount = current + amount
@@ -422,8 +749,26 @@ async def add_calories(amount: int):
         {"$set": {"calorie_current": new_amount}},
         upsert=True
     )
+    await db.calorie_log.update_one(
+        {"_id": datetime.now().strftime("%Y-%m-%d")},
+        {"$inc": {"calories": amount}},
+        upsert=True
+    )
     return {"calorie_current": new_amount}
 
+@api_router.post("/settings/calorie/complete")
+async def set_calorie_day_complete(date: Optional[str] = None, complete: bool = True):
+    """Mark a day's calorie log as complete (or not). A day logged below half the estimated TDEE
+    only feeds the TDEE estimate once marked complete; use /tdee/rebuild for days already folded in."""
+    date = date or datetime.now().strftime("%Y-%m-%d")
+    log = await db.calorie_log.find_one_and_update(
+        {"_id": date},
+        {"$set": {"complete": complete}, "$setOnInsert": {"calories": 0}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return {"date": date, "calories": log["calories"], "complete": log["complete"]}
+
 @api_router.post("/settings/calorie/set-target")
 async def set_calorie_target(target: int):
     """Set daily calorie target"""
@@ -432,6 +777,7 @@ async def set_calorie_target(target: int):
         {"$set": {"calorie_target": target}},
         upsert=True
     )
+    await invalidate_weekly_summaries()
     return {"calorie_target": target}
 
 # ========== SUPPLEMENTS ==========
@@ -578,29 +924,51 @@ async def get_today_schedule():
 
 @api_router.post("/ai/recipe")
 async def generate_recipe(req: RecipeRequest):
-    """Generate a detailed recipe using AI with optional scaling for family portions"""
+    """Generate a detailed recipe using AI with optional scaling for family portions.
+    Library recipes are parsed and stored per meal_id/servings; later calls read the stored record."""
+    
+    cache_key = recipe_key(req.meal_id, req.servings) if req.meal_id else None
+    if cache_key and not req.regenerate:
+        stored = await db.recipes.find_one({"_id": cache_key}, {"_id": 0})
+        if stored:
+            return {**stored, "cached": True}
     
     # Get meal data for scaling info
-    meal_data = None
-    if req.meal_id:
-        for category_meals in EXTENDED_MEAL_LIBRARY.values():
-            for m in category_meals:
-                if m["id"] == req.meal_id:
-                    meal_data = m
-                    break
-            if meal_data:
-                break
+    meal_data = MEALS_BY_ID.get(req.meal_id) if req.meal_id else None
     
     # Determine serving size
-    dad_servings = meal_data.get("dad_servings", 1) if meal_data else 1
-    family_servings = meal_data.get("family_servings", 4) if meal_data else 4
-    
+    serving_count = resolve_serving_count(meal_data, req.servings)
     if req.servings == "family":
-        serving_text = f"FAMILY SIZE ({family_servings} servings)"
-        scale_note = f"Scale all ingredients by {family_servings}x for family portions."
-    else:
-        serving_text = f"INDIVIDUAL ({dad_servings} serving)"
+        serving_text = f"FAMILY SIZE ({serving_count} servings)"
+        scale_note = f"Scale all ingredients by {serving_count}x for family portions."
+    elif req.servings == "individual":
+        serving_text = f"INDIVIDUAL ({serving_count} serving)"
         scale_note = "Standard single serving for your meal prep."
+    else:
+        serving_text = f"{serving_count} SERVINGS"
+        scale_note = f"Scale all ingredients for {serving_count} servings."
+    
+    # Portion change for a library meal: reuse the stored narrative (preferably the
+    # base individual record) and scale the ingredients locally instead of calling
+    # the AI again. Text that quotes amounts would be wrong at the new size.
+    if meal_data and not req.regenerate:
+        source = await db.recipes.find_one({"_id": recipe_key(req.meal_id, "individual")}, {"_id": 0})
+        if source is None:
+            source = await db.recipes.find_one({"meal_id": req.meal_id, "servings": {"$ne": req.servings}}, {"_id": 0})
+        narrative = serving_free_narrative(source["structured"]) if source else None
+        if narrative is not None:
+            structured = {"ingredients": scaled_meal_ingredients(meal_data, req.servings), **narrative}
+            record = {
+                "recipe": render_recipe_markdown(structured, req.meal_name, serving_text),
+                "servings": req.servings,
+                "serving_count": serving_count,
+                "meal_id": req.meal_id,
+                "meal_name": req.meal_name,
+                "structured": structured,
+                "generated_at": datetime.now(timezone.utc).isoformat()
+            }
+            await db.recipes.update_one({"_id": cache_key}, {"$set": record}, upsert=True)
+            return {**record, "cached": True}
     
     system_message = """You are an expert meal prep coach for busy fathers focused on physique transformation. 
     Create detailed, practical recipes that are:
@@ -627,11 +995,55 @@ Please provide:
 Focus on efficiency and high protein content for a 30-year-old father working towards 12% body fat."""
     
     response = await get_ai_response(prompt, system_message)
-    return {"recipe": response, "servings": req.servings, "serving_count": family_servings if req.servings == "family" else dad_servings}
+    
+    structured = parse_recipe_markdown(response)
+    if meal_data:
+        # Library quantities are authoritative; the AI only supplies the narrative
+        structured["ingredients"] = scaled_meal_ingredients(meal_data, req.servings)
+        # Fall back to library macros for anything the model didn't state clearly
+        for macro in ["calories", "protein", "carbs", "fat"]:
+            if structured["macros"].get(macro) is None:
+                structured["macros"][macro] = meal_data.get(macro)
+    
+    record = {
+        "recipe": response,
+        "servings": req.servings,
+        "serving_count": serving_count,
+        "meal_id": req.meal_id,
+        "meal_name": req.meal_name,
+        "structured": structured,
+        "generated_at": datetime.now(timezone.utc).isoformat()
+    }
+    if cache_key:
+        await db.recipes.update_one({"_id": cache_key}, {"$set": record}, upsert=True)
+    
+    return {**record, "cached": False}
+
+@api_router.get("/meals/{meal_id}/ingredients")
+async def get_scaled_ingredients(meal_id: str, servings: str = "individual"):
+    """Scale a library meal's ingredients locally ("individual", "family" or any number of servings)"""
+    meal_data = MEALS_BY_ID.get(meal_id)
+    if not meal_data:
+        raise HTTPException(status_code=404, detail="Meal not found")
+    return {
+        "meal_id": meal_id,
+        "meal_name": meal_data["name"],
+        "servings": servings,
+        "serving_count": resolve_serving_count(meal_data, servings),
+        "ingredients": scaled_meal_ingredients(meal_data, servings)
+    }
+
+@api_router.get("/recipes/{meal_id}")
+async def get_stored_recipe(meal_id: str, servings: str = "individual"):
+    """Get the stored structured recipe (ingredients, steps, macros) for a meal"""
+    stored = await db.recipes.find_one({"_id": recipe_key(meal_id, servings)}, {"_id": 0})
+    if not stored:
+        raise HTTPException(status_code=404, detail="Recipe not generated yet")
+    return stored
 
 @api_router.post("/ai/motivation")
-async def get_motivation(req: AIRequest):
-    """Get motivational coaching message"""
+async def get_motivation(req: AIRequest, stream: bool = False):
+    """Get motivational coaching message (stream=true streams tokens as plain text)"""
     system_message = """You are a stoic, no-nonsense strength coach for a 30-year-old father of two young kids.
     Your style is direct, powerful, and legacy-focused. You speak to the 'beast within' and remind him why he started.
     Keep responses under 100 words. Be impactful, not flowery."""
@@ -647,6 +1059,8 @@ Give me a powerful 60-second motivational reminder about:
 
 Be direct. Be powerful. Make me want to attack the workout."""
     
+    if stream:
+        return stream_ai_response(prompt, system_message)
     response = await get_ai_response(prompt, system_message)
     return {"message": response}
 
@@ -670,6 +1084,13 @@ async def performance_audit():
     last_7_days = [(today - timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
     workouts_completed = sum(1 for d in last_7_days if habits.get(d, False))
     
+    # Only these inputs reach the prompt; the audit is regenerated when they change
+    audit_inputs = {
+        "metrics": [{k: m.get(k) for k in ["date", "weight", "body_fat"]} for m in metrics],
+        "protein_target": settings.get('protein_target', 200),
+        "workouts_completed": workouts_completed
+    }
+    
     data_summary = f"""
 **Current Status:**
 - Latest Body Fat: {metrics[0]['body_fat']}% (Goal: 12%)
@@ -692,8 +1113,8 @@ Audit this data against the 12% body fat goal. Provide:
 
 Be direct. Give actionable feedback for a working father."""
     
-    response = await get_ai_response(prompt, system_message)
-    return {"audit": response}
+    result = await get_cached_ai_response("performance_audit", audit_inputs, prompt, system_message)
+    return {"audit": result["response"], "cached": result["cached"]}
 
 @api_router.post("/ai/suggest-recipes")
 async def suggest_recipes(category: str):
@@ -818,11 +1239,16 @@ async def get_meal_plan():
 @api_router.post("/meal-plan/save")
 async def save_meal_plan(meal_plan: List[MealPlanEntry], weeks: int):
     """Save meal plan"""
-    await db.meal_plan.update_one(
+    previous = await db.meal_plan.find_one_and_update(
         {"_id": "user_meal_plan"},
         {"$set": {"meals": [m.model_dump() for m in meal_plan], "weeks": weeks}},
-        upsert=True
+        projection={"meals.date": 1},
+        upsert=True,
+        return_document=ReturnDocument.BEFORE
     )
+    # Weeks covered by either the replaced plan or the new one, closed ones included
+    dates = {m["date"] for m in (previous or {}).get("meals", [])} | {m.date for m in meal_plan}
+    await invalidate_weekly_summaries(sorted(dates))
     return {"success": True}
 
 @api_router.post("/meal-plan/update-meal")
@@ -860,6 +1286,7 @@ async def update_meal_in_plan(req: MealSelectionRequest):
             {"_id": "user_meal_plan"},
             {"$set": {"meals": meals}}
         )
+        await invalidate_weekly_summaries([req.date])
         return {"success": True, "updated_meal": req.meal_id}
     else:
         raise HTTPException(status_code=404, detail="Meal not found in plan")
@@ -1000,93 +1427,205 @@ async def mark_meal_prepped(meal_id: str, dates: List[str]):
     meals = plan_doc.get("meals", [])
     prep_date = datetime.now().strftime("%Y-%m-%d")
     
-    # Update all matching meals
+    # Update all matching meals; prepped food keeps for the meal's shelf life
+    meal_data = MEALS_BY_ID.get(meal_id)
+    expiry_date = add_days(prep_date, meal_data.get("shelf_life_days", 3)) if meal_data else None
     for meal in meals:
         if meal["meal_id"] == meal_id and meal["date"] in dates:
             meal["is_prepped"] = True
             meal["prep_date"] = prep_date
+            meal["expiry_date"] = expiry_date
     
     await db.meal_plan.update_one(
         {"_id": "user_meal_plan"},
         {"$set": {"meals": meals}}
     )
+    await invalidate_weekly_summaries(dates)
+    
+    # Deduct ingredients from inventory for this meal: one set of library ingredients per planned entry being prepped
+    servings = sum(1 for meal in meals if meal["meal_id"] == meal_id and meal["date"] in dates)
+    if not meal_data or servings == 0:
+        # Nothing in the plan was prepped, so nothing was cooked from inventory
+        return {"success": True, "ingredients_deducted": [], "servings": 0}
+    # Keyed by normalised name so "rolled oats" in the pantry matches "Rolled Oats"
+    needed = defaultdict(QuantityTotal)
+    for ingredient in meal_data.get("ingredients", []):
+        needed[ingredient_key(ingredient["item"])].add_text(ingredient["amount"], servings)
+    
+    rows = [row async for row in db.inventory.find({}).sort("purchased_date", 1) if ingredient_key(row["item"]) in needed]
+    operations = []
+    ingredients_used = []
+    for row in rows:
+        key = ingredient_key(row["item"])
+        remaining_need = needed[key]
+        if remaining_need.is_empty():
+            continue
+        have = inventory_row_total(row)
+        if not have.amounts:
+            # Amount we can't measure: treat the row as used up
+            operations.append(DeleteOne({"_id": row["_id"]}))
+            needed[key] = QuantityTotal()
+        else:
+            left = have.minus(remaining_need)
+            if left.amounts == have.amounts:
+                # Nothing measurable to take from this row (e.g. counted vs by the cup)
+                continue
+            needed[key] = remaining_need.minus(have)
+            if left.is_empty():
+                operations.append(DeleteOne({"_id": row["_id"]}))
+            else:
+                operations.append(UpdateOne({"_id": row["_id"]}, {"$set": inventory_amount_fields(left.format())}))
+        if row["item"] not in ingredients_used:
+            ingredients_used.append(row["item"])
     
-    # Deduct ingredients from inventory for this meal
-    meal_data = None
-    for category_meals in EXTENDED_MEAL_LIBRARY.values():
-        for m in category_meals:
-            if m["id"] == meal_id:
-                meal_data = m
-                break
-        if meal_data:
-            break
-    
-    if meal_data:
-        ingredients_used = []
-        for ingredient in meal_data.get("ingredients", []):
-            item_name = ingredient["item"]
-            # Remove the ingredient from inventory
-            result = await db.inventory.delete_one({"item": item_name})
-            if result.deleted_count > 0:
-                ingredients_used.append(item_name)
-        
-        return {"success": True, "ingredients_deducted": ingredients_used}
+    if operations:
+        await db.inventory.bulk_write(operations, ordered=False)
+        await bump_inventory_version()
     
-    return {"success": True, "ingredients_deducted": []}
+    return {"success": True, "ingredients_deducted": ingredients_used, "servings": servings}
+
+def inventory_amount_fields(amount: str) -> Dict[str, Any]:
+    """Amount string plus its parsed quantity, for inventory writes"""
+    return {"amount": amount, "quantity": QuantityTotal.from_text(amount).to_doc()}
+
+def inventory_row_total(row: Dict[str, Any]) -> QuantityTotal:
+    """Parsed quantity of an inventory row, falling back to its amount text for older rows"""
+    if row.get("quantity"):
+        return QuantityTotal.from_doc(row["quantity"])
+    return QuantityTotal.from_text(row.get("amount", ""))
+
+async def inventory_totals() -> Dict[str, QuantityTotal]:
+    """Inventory on hand keyed by normalised item name, with duplicate rows summed"""
+    totals = defaultdict(QuantityTotal)
+    async for row in db.inventory.find({}, {"_id": 0, "item": 1, "amount": 1, "quantity": 1}):
+        totals[ingredient_key(row["item"])].merge(inventory_row_total(row))
+    return totals
 
 @api_router.get("/shopping-list/generate")
-async def generate_shopping_list():
-    """Generate shopping list from meal plan"""
+async def generate_shopping_list(subtract_inventory: bool = True):
+    """Generate shopping list from meal plan, minus what is already in inventory"""
     plan_doc = await db.meal_plan.find_one({"_id": "user_meal_plan"})
     if not plan_doc:
-        return {"shopping_list": []}
+        return {"shopping_list": [], "covered_by_inventory": []}
     
     meals = plan_doc.get("meals", [])
     
-    # Aggregate ingredients
-    ingredient_totals = defaultdict(lambda: {"amount": [], "category": "", "meal_ids": set()})
-    
+    # Aggregate exact totals per ingredient in one pass over the plan
+    meal_counts = defaultdict(int)
     for meal_entry in meals:
-        # Find meal in extended library
-        meal_data = None
-        for category_meals in EXTENDED_MEAL_LIBRARY.values():
-            for m in category_meals:
-                if m["id"] == meal_entry["meal_id"]:
-                    meal_data = m
-                    break
-        
-        if meal_data:
-            for ingredient in meal_data.get("ingredients", []):
-                item_name = ingredient["item"]
-                ingredient_totals[item_name]["amount"].append(ingredient["amount"])
-                ingredient_totals[item_name]["category"] = ingredient["category"]
-                ingredient_totals[item_name]["meal_ids"].add(meal_entry["meal_id"])
+        meal_counts[meal_entry["meal_id"]] += 1
+    
+    ingredient_totals = defaultdict(lambda: {"total": QuantityTotal(), "category": "", "meal_ids": set()})
+    for meal_id, count in meal_counts.items():
+        meal_data = MEALS_BY_ID.get(meal_id)
+        if not meal_data:
+            continue
+        for ingredient in meal_data.get("ingredients", []):
+            data = ingredient_totals[ingredient["item"]]
+            data["total"].add_text(ingredient["amount"], count)
+            data["category"] = ingredient["category"]
+            data["meal_ids"].add(meal_id)
+    
+    # Merge against inventory: one lookup per required item
+    on_hand = await inventory_totals() if subtract_inventory else {}
     
     # Convert to list format
     shopping_list = []
+    covered = []
     for item, data in ingredient_totals.items():
+        needed = data["total"]
+        have = on_hand.get(ingredient_key(item))
+        if have is not None:
+            needed = needed.minus(have)
+            if needed.is_empty():
+                covered.append(item)
+                continue
         shopping_list.append({
+            "id": shopping_item_id(item),
             "item": item,
-            "amount": ", ".join(set(data["amount"])),  # Combine amounts
+            "amount": needed.format(),
+            "purchase_amount": needed.purchase(item),
             "category": data["category"],
             "purchased": False,
-            "meal_ids": list(data["meal_ids"])
+            "meal_ids": sorted(data["meal_ids"])
         })
     
     # Sort by category
     category_order = {cat: i for i, cat in enumerate(SHOPPING_CATEGORIES)}
     shopping_list.sort(key=lambda x: category_order.get(x["category"], 99))
     
-    return {"shopping_list": shopping_list}
+    return {"shopping_list": shopping_list, "covered_by_inventory": covered}
+
+def shopping_item_id(item_name: str) -> str:
+    """Stable id for a shopping list item, the same every time the list is regenerated"""
+    return hashlib.sha1(ingredient_key(item_name).encode()).hexdigest()[:12]
+
+def with_item_ids(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [item if item.get("id") else {**item, "id": shopping_item_id(item["item"])} for item in items]
+
+def purchased_inventory_row(list_item: Dict[str, Any], purchased_date: str) -> Dict[str, Any]:
+    """Inventory row for a shopping list item that was just bought"""
+    return {
+        "item": list_item["item"],
+        **inventory_amount_fields(list_item["amount"]),
+        "category": list_item["category"],
+        "purchased_date": purchased_date,
+        "expiry_date": default_expiry(list_item["item"], list_item["category"], purchased_date),
+        "purchases": {list_item["id"]: list_item["amount"]}
+    }
+
+async def add_purchase_to_inventory(bought: List[Dict[str, Any]]) -> int:
+    """Add bought shopping list items to inventory, merging into rows bought earlier today.
+    Each row records what every shopping item added under purchases.<item id>."""
+    purchased_date = datetime.now().strftime("%Y-%m-%d")
+    todays_rows = {}
+    async for row in db.inventory.find({"item": {"$in": [item["item"] for item in bought]}, "purchased_date": purchased_date}):
+        todays_rows.setdefault(row["item"], row)
+    operations = []
+    for item in bought:
+        row = todays_rows.get(item["item"])
+        merged = QuantityTotal.from_text(item["amount"])
+        if row is not None:
+            merged.merge(inventory_row_total(row))
+        if row is not None and merged.to_doc() is not None:
+            operations.append(UpdateOne({"_id": row["_id"]}, {"$set": {
+                **inventory_amount_fields(merged.format()),
+                f"purchases.{item['id']}": item["amount"]
+            }}))
+        else:
+            operations.append(InsertOne(purchased_inventory_row(item, purchased_date)))
+    
+    if not operations:
+        return await get_inventory_version()
+    await db.inventory.bulk_write(operations, ordered=False)
+    return await bump_inventory_version()
+
+async def remove_purchase_from_inventory(list_item: Dict[str, Any]) -> int:
+    """Take an un-checked item's purchase back out of the inventory row it was added to"""
+    purchase_key = f"purchases.{list_item['id']}"
+    row = await db.inventory.find_one({purchase_key: {"$exists": True}}, sort=[("purchased_date", -1)])
+    if row is None:
+        return await get_inventory_version()
+    left = inventory_row_total(row).minus(QuantityTotal.from_text(row["purchases"][list_item["id"]]))
+    if left.is_empty():
+        await db.inventory.delete_one({"_id": row["_id"]})
+    else:
+        await db.inventory.update_one(
+            {"_id": row["_id"]},
+            {"$set": inventory_amount_fields(left.format()), "$unset": {purchase_key: ""}}
+        )
+    return await bump_inventory_version()
 
 @api_router.post("/shopping-list/save")
 async def save_shopping_list(items: List[ShoppingListItem]):
     """Save shopping list"""
+    saved = with_item_ids([item.model_dump() for item in items])
     await db.shopping_list.update_one(
         {"_id": "user_shopping_list"},
-        {"$set": {"items": [item.model_dump() for item in items]}},
+        {"$set": {"items": saved}},
         upsert=True
     )
+    publish_shopping_event({"type": "list_replaced", "items": saved})
     return {"success": True}
 
 @api_router.get("/shopping-list")
@@ -1095,48 +1634,263 @@ async def get_shopping_list():
     list_doc = await db.shopping_list.find_one({"_id": "user_shopping_list"})
     if not list_doc:
         return {"items": []}
-    return {"items": list_doc.get("items", [])}
-
-@api_router.post("/shopping-list/toggle-purchased")
-async def toggle_purchased(item_index: int):
-    """Toggle purchased status of shopping list item"""
-    list_doc = await db.shopping_list.find_one({"_id": "user_shopping_list"})
-    if not list_doc:
-        raise HTTPException(status_code=404, detail="Shopping list not found")
-    
     items = list_doc.get("items", [])
-    if 0 <= item_index < len(items):
-        was_purchased = items[item_index].get("purchased", False)
-        items[item_index]["purchased"] = not was_purchased
-        
-        item_name = items[item_index]["item"]
-        
-        if items[item_index]["purchased"]:
-            # Add to inventory when checking off
-            inventory_item = {
-                "item": item_name,
-                "amount": items[item_index]["amount"],
-                "category": items[item_index]["category"],
-                "purchased_date": datetime.now().strftime("%Y-%m-%d"),
-                "expiry_date": None
-            }
-            await db.inventory.insert_one(inventory_item)
-        else:
-            # Remove from inventory when unchecking (bug fix)
-            await db.inventory.delete_one({"item": item_name})
-    
-    await db.shopping_list.update_one(
+    if any(not item.get("id") for item in items):
+        # Lists saved before items had ids
+        items = with_item_ids(items)
+        await db.shopping_list.update_one({"_id": "user_shopping_list"}, {"$set": {"items": items}})
+    return {"items": items}
+
+class ShoppingCheckoutRequest(BaseModel):
+    item_ids: List[str]
+
+@api_router.post("/shopping-list/checkout")
+async def checkout_shopping_items(req: ShoppingCheckoutRequest):
+    """Mark many shopping list items purchased at once and add them all to inventory"""
+    item_ids = list(dict.fromkeys(req.item_ids))
+    # One atomic flip; the pre-image tells us which items this call actually bought
+    before = await db.shopping_list.find_one_and_update(
         {"_id": "user_shopping_list"},
-        {"$set": {"items": items}}
+        {"$set": {"items.$[item].purchased": True}},
+        array_filters=[{"item.id": {"$in": item_ids}, "item.purchased": {"$ne": True}}],
+        return_document=ReturnDocument.BEFORE
     )
+    if not before:
+        raise HTTPException(status_code=404, detail="Shopping list not found")
     
-    return {"success": True, "items": items}
+    by_id = {item.get("id"): item for item in before.get("items", [])}
+    bought = [by_id[item_id] for item_id in item_ids if item_id in by_id and not by_id[item_id].get("purchased")]
+    
+    version = await add_purchase_to_inventory(bought)
+    for item in bought:
+        publish_shopping_event({"type": "item_updated", "item": {**item, "purchased": True}})
+    
+    return {
+        "success": True,
+        "purchased": [item["id"] for item in bought],
+        "already_purchased": [item_id for item_id in item_ids if item_id in by_id and by_id[item_id].get("purchased")],
+        "not_found": [item_id for item_id in item_ids if item_id not in by_id],
+        "inventory_version": version
+    }
+
+async def set_item_purchased(item_id: str, purchased: Optional[bool]) -> Dict[str, Any]:
+    """Set (or toggle, if purchased is None) one item with a positional $set, guarded by its current state"""
+    for _ in range(3):
+        doc = await db.shopping_list.find_one({"_id": "user_shopping_list", "items.id": item_id}, {"items.$": 1})
+        if not doc:
+            raise HTTPException(status_code=404, detail="Shopping list item not found")
+        item = doc["items"][0]
+        current = item.get("purchased", False)
+        target = not current if purchased is None else purchased
+        if target == current:
+            return {"item": item, "changed": False}
+        result = await db.shopping_list.update_one(
+            {"_id": "user_shopping_list", "items": {"$elemMatch": {"id": item_id, "purchased": current}}},
+            {"$set": {"items.$.purchased": target}}
+        )
+        if result.modified_count:
+            return {"item": {**item, "purchased": target}, "changed": True}
+    raise HTTPException(status_code=409, detail="Item is being changed by someone else, try again")
+
+@api_router.post("/shopping-list/toggle-purchased")
+async def toggle_purchased(item_id: Optional[str] = None, item_index: Optional[int] = None, purchased: Optional[bool] = None):
+    """Toggle (or set) purchased status of one shopping list item by id; item_index is still accepted"""
+    if item_id is None:
+        if item_index is None:
+            raise HTTPException(status_code=400, detail="item_id is required")
+        items = (await get_shopping_list())["items"]
+        if not 0 <= item_index < len(items):
+            return {"success": True, "items": items}
+        item_id = items[item_index]["id"]
+    
+    result = await set_item_purchased(item_id, purchased)
+    item = result["item"]
+    if result["changed"]:
+        if item["purchased"]:
+            # Same inventory row checkout would have used
+            await add_purchase_to_inventory([item])
+        else:
+            # Only what this item added; pantry rows and other purchases stay
+            await remove_purchase_from_inventory(item)
+        publish_shopping_event({"type": "item_updated", "item": item})
+    
+    items = (await get_shopping_list())["items"]
+    return {"success": True, "item": item, "items": items}
+
+# ========== SHOPPING LIST LIVE UPDATES ==========
+
+# One queue per connected /shopping-list/events client. In-process only, so
+# every shopper must be served by the same backend worker.
+shopping_subscribers: set = set()
+SHOPPING_HEARTBEAT_SECONDS = 15
+# Events a client may fall behind by before it is disconnected
+SHOPPING_QUEUE_SIZE = 100
+
+def publish_shopping_event(event: Dict[str, Any]):
+    """Broadcast a shopping list change to every connected client"""
+    for queue in list(shopping_subscribers):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too slow to keep up: close its stream (None) so it reconnects and refetches
+            shopping_subscribers.discard(queue)
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+@api_router.get("/shopping-list/events")
+async def shopping_list_events():
+    """Server-sent events stream of shopping list changes"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=SHOPPING_QUEUE_SIZE)
+    shopping_subscribers.add(queue)
+    
+    async def stream():
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), SHOPPING_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is None:
+                    return
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            shopping_subscribers.discard(queue)
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+MAX_INVENTORY_PAGE = 500
+
+async def get_inventory_version() -> int:
+    doc = await db.inventory_meta.find_one({"_id": "version"})
+    return doc.get("version", 0) if doc else 0
+
+async def bump_inventory_version() -> int:
+    """Advance the inventory change version; clients refetch if they see a gap"""
+    doc = await db.inventory_meta.find_one_and_update(
+        {"_id": "version"},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["version"]
 
 @api_router.get("/inventory")
-async def get_inventory():
-    """Get current food inventory"""
-    inventory = await db.inventory.find({}, {"_id": 0}).to_list(1000)
-    return {"inventory": inventory}
+async def get_inventory(
+    category: Optional[List[str]] = Query(None),
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """Get current food inventory, optionally filtered by category and paged with an opaque cursor.
+    Rows are streamed straight from the Mongo cursor."""
+    query = {}
+    if category:
+        query["category"] = {"$in": category}
+    if cursor:
+        if not ObjectId.is_valid(cursor):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["_id"] = {"$gt": ObjectId(cursor)}
+    if limit is not None:
+        limit = max(1, min(MAX_INVENTORY_PAGE, limit))
+    version = await get_inventory_version()
+    
+    rows = db.inventory.find(query).sort("_id", 1)
+    if limit:
+        # One extra row tells us whether there is a next page
+        rows = rows.limit(limit + 1)
+    
+    async def stream():
+        count = 0
+        last_id = None
+        next_cursor = None
+        yield '{"inventory": ['
+        try:
+            async for row in rows:
+                if limit and count == limit:
+                    next_cursor = str(last_id)
+                    break
+                last_id = row.pop("_id")
+                yield ("," if count else "") + json.dumps(row, default=str)
+                count += 1
+        finally:
+            await rows.close()
+        yield f'], "next_cursor": {json.dumps(next_cursor)}, "version": {version}}}'
+    return StreamingResponse(stream(), media_type="application/json")
+
+@api_router.get("/inventory/forecast")
+async def get_inventory_forecast():
+    """Simulate the saved meal plan against inventory: run-out date per item plus expiry flags"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    plan_doc = await db.meal_plan.find_one({"_id": "user_meal_plan"})
+    upcoming = sorted(
+        (meal for meal in (plan_doc or {}).get("meals", []) if meal["date"] >= today),
+        key=lambda meal: meal["date"]
+    )
+    days = plan_days(today, upcoming[-1]["date"]) if upcoming else []
+    day_index = {day: i for i, day in enumerate(days)}
+    
+    # Prepped meals already came out of inventory; check they're eaten within shelf life
+    needs = defaultdict(lambda: defaultdict(QuantityTotal))
+    names = {}
+    prepped_expiring = []
+    for meal in upcoming:
+        meal_data = MEALS_BY_ID.get(meal["meal_id"])
+        if not meal_data:
+            continue
+        if meal.get("is_prepped"):
+            good_until = meal.get("expiry_date") or add_days(meal.get("prep_date") or today, meal_data.get("shelf_life_days", 3))
+            if meal["date"] > good_until:
+                prepped_expiring.append({**meal, "good_until": good_until})
+            continue
+        for ingredient in meal_data.get("ingredients", []):
+            key = ingredient_key(ingredient["item"])
+            names.setdefault(key, ingredient["item"])
+            needs[key][day_index[meal["date"]]].add_text(ingredient["amount"])
+    
+    # Keyed by normalised name like the needs, so pantry spellings still count
+    on_hand = defaultdict(QuantityTotal)
+    expiry_dates = {}
+    async for row in db.inventory.find({}, {"_id": 0, "item": 1, "amount": 1, "quantity": 1, "expiry_date": 1}):
+        key = ingredient_key(row["item"])
+        names.setdefault(key, row["item"])
+        on_hand[key].merge(inventory_row_total(row))
+        if row.get("expiry_date") and (key not in expiry_dates or row["expiry_date"] < expiry_dates[key]):
+            expiry_dates[key] = row["expiry_date"]
+    
+    items = forecast_inventory(days, needs, on_hand, expiry_dates)
+    for item in items:
+        item["item"] = names[item["item"]]
+    return {
+        "start": today,
+        "end": days[-1] if days else today,
+        "items": items,
+        "running_out": [item["item"] for item in items if item["runs_out_on"]],
+        "expiring_before_use": [item["item"] for item in items if item["expires_before_use"]],
+        "prepped_meals_expiring": prepped_expiring
+    }
+
+@api_router.get("/inventory/expiring")
+async def get_expiring_inventory(days: int = 3):
+    """Inventory items and prepped meals expiring within `days` (including anything already expired)"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    cutoff = add_days(today, max(0, days))
+    items = await db.inventory.find(
+        {"expiry_date": {"$ne": None, "$lte": cutoff}}, {"_id": 0}
+    ).sort("expiry_date", 1).to_list(None)
+    
+    plan_doc = await db.meal_plan.find_one({"_id": "user_meal_plan"})
+    prepped = sorted(
+        (meal for meal in (plan_doc or {}).get("meals", [])
+         if meal.get("is_prepped") and meal["date"] >= today and meal.get("expiry_date") and meal["expiry_date"] <= cutoff),
+        key=lambda meal: meal["expiry_date"]
+    )
+    return {
+        "cutoff": cutoff,
+        "items": items,
+        "expired": [item["item"] for item in items if item["expiry_date"] < today],
+        "prepped_meals": prepped
+    }
 
 # ========== INVENTORY MANAGEMENT ==========
 
@@ -1144,6 +1898,7 @@ class InventoryAddRequest(BaseModel):
     item: str
     amount: str
     category: str
+    expiry_date: Optional[str] = None  # YYYY-MM-DD, defaults from category shelf life
 
 class InventoryUpdateRequest(BaseModel):
     item: str
@@ -1152,37 +1907,71 @@ class InventoryUpdateRequest(BaseModel):
 @api_router.post("/inventory/add")
 async def add_inventory_item(req: InventoryAddRequest):
     """Manually add an item to inventory"""
+    purchased_date = datetime.now().strftime("%Y-%m-%d")
     inventory_item = {
         "item": req.item,
-        "amount": req.amount,
+        **inventory_amount_fields(req.amount),
         "category": req.category,
-        "purchased_date": datetime.now().strftime("%Y-%m-%d"),
-        "expiry_date": None
+        "purchased_date": purchased_date,
+        "expiry_date": req.expiry_date or default_expiry(req.item, req.category, purchased_date)
     }
     await db.inventory.insert_one(inventory_item)
-    inventory = await db.inventory.find({}, {"_id": 0}).to_list(1000)
-    return {"success": True, "inventory": inventory}
+    inventory_item.pop("_id", None)
+    return {"success": True, "item": inventory_item, "version": await bump_inventory_version()}
 
 @api_router.post("/inventory/update")
 async def update_inventory_item(req: InventoryUpdateRequest):
     """Update quantity of an inventory item"""
-    result = await db.inventory.update_one(
+    item = await db.inventory.find_one_and_update(
         {"item": req.item},
-        {"$set": {"amount": req.amount}}
+        {"$set": inventory_amount_fields(req.amount)},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
     )
-    if result.matched_count == 0:
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found in inventory")
-    inventory = await db.inventory.find({}, {"_id": 0}).to_list(1000)
-    return {"success": True, "inventory": inventory}
+    return {"success": True, "item": item, "version": await bump_inventory_version()}
 
 @api_router.delete("/inventory/{item_name}")
 async def delete_inventory_item(item_name: str):
     """Remove an item from inventory"""
-    result = await db.inventory.delete_one({"item": item_name})
-    if result.deleted_count == 0:
+    item = await db.inventory.find_one_and_delete({"item": item_name}, projection={"_id": 0})
+    if item is None:
         raise HTTPException(status_code=404, detail="Item not found in inventory")
-    inventory = await db.inventory.find({}, {"_id": 0}).to_list(1000)
-    return {"success": True, "inventory": inventory}
+    return {"success": True, "deleted": item, "version": await bump_inventory_version()}
+
+async def inventory_mask() -> int:
+    """Ingredient bitmask of everything currently in inventory"""
+    items = await db.inventory.distinct("item")
+    return MEAL_INDEX.mask_for(items)
+
+@api_router.get("/meals/makeable")
+async def get_makeable_meals(category: Optional[str] = None):
+    """Rank every library meal by how many ingredients are missing from inventory"""
+    if category and category not in EXTENDED_MEAL_LIBRARY:
+        raise HTTPException(status_code=400, detail=f"category must be one of {', '.join(EXTENDED_MEAL_LIBRARY)}")
+    meals = MEAL_INDEX.rank(await inventory_mask(), category)
+    return {
+        "meals": meals,
+        "makeable_count": sum(1 for meal in meals if meal["can_make"])
+    }
+
+USE_IT_UP_DAYS = 3
+
+@api_router.get("/meals/by-ingredients")
+async def get_meals_by_ingredients(
+    items: Optional[List[str]] = Query(None),
+    category: Optional[str] = None,
+    days: int = USE_IT_UP_DAYS
+):
+    """Meals ranked by how many of the given ingredients they use. Without items,
+    uses inventory expiring within `days` ("use it up" suggestions)."""
+    if category and category not in EXTENDED_MEAL_LIBRARY:
+        raise HTTPException(status_code=400, detail=f"category must be one of {', '.join(EXTENDED_MEAL_LIBRARY)}")
+    if not items:
+        cutoff = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+        items = await db.inventory.distinct("item", {"expiry_date": {"$ne": None, "$lte": cutoff}})
+    return {"items": items, "meals": MEAL_INDEX.by_ingredients(items, category)}
 
 @api_router.get("/meal-plan/suggestions-today")
 async def get_today_suggestions():
@@ -1199,9 +1988,7 @@ async def get_today_suggestions():
             if meal["date"] == today:
                 today_meals[meal["meal_type"]] = meal
     
-    # Get inventory
-    inventory = await db.inventory.find({}, {"_id": 0}).to_list(1000)
-    available_items = {item["item"] for item in inventory}
+    available = await inventory_mask()
     
     # Build suggestions
     suggestions = {
@@ -1218,18 +2005,9 @@ async def get_today_suggestions():
             if planned.get("is_prepped"):
                 suggestions[meal_type]["status"] = "ready_to_eat"
             else:
-                # Find meal data
-                meal_data = None
-                for category_meals in EXTENDED_MEAL_LIBRARY.values():
-                    for m in category_meals:
-                        if m["id"] == planned["meal_id"]:
-                            meal_data = m
-                            break
-                
-                if meal_data:
+                if planned["meal_id"] in MEALS_BY_ID:
                     # Check if can make from inventory
-                    meal_ingredients = {ing["item"] for ing in meal_data.get("ingredients", [])}
-                    if meal_ingredients.issubset(available_items):
+                    if MEAL_INDEX.can_make(planned["meal_id"], available):
                         suggestions[meal_type]["status"] = "can_make_now"
                     else:
                         suggestions[meal_type]["status"] = "need_ingredients"
@@ -1237,8 +2015,7 @@ async def get_today_suggestions():
             # Find alternatives that can be made
             for category_meals in EXTENDED_MEAL_LIBRARY[meal_type]:
                 if category_meals["id"] != planned["meal_id"]:
-                    meal_ingredients = {ing["item"] for ing in category_meals.get("ingredients", [])}
-                    if meal_ingredients.issubset(available_items):
+                    if MEAL_INDEX.can_make(category_meals["id"], available):
                         suggestions[meal_type]["alternatives"].append({
                             "id": category_meals["id"],
                             "name": category_meals["name"],
@@ -1269,19 +2046,76 @@ async def get_daily_totals(date: str):
 
 # ========== WEEKLY SUMMARY ==========
 
-@api_router.get("/summary/weekly")
-async def get_weekly_summary():
-    """Get comprehensive weekly summary stats"""
+# Materialized weekly summaries, one document per ISO week. Open weeks
+# (ending today or later) are dropped on any write to the collections the
+# summary reads; closed weeks are kept permanently unless a write lands in them.
+summary_generation = 0
+MAX_SUMMARY_RANGE_WEEKS = 260
+
+def iso_week_id(day: datetime) -> str:
+    """ISO week id like 2026-W07"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+def parse_iso_week(week: str) -> datetime:
+    """Monday of an ISO week id like 2026-W07"""
+    try:
+        return datetime.strptime(f"{week}-1", "%G-W%V-%u")
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid week '{week}', expected YYYY-Www")
+
+def current_week_start() -> datetime:
     today = datetime.now()
     week_start = today - timedelta(days=today.weekday())  # Monday
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    
+    return week_start.replace(hour=0, minute=0, second=0, microsecond=0)
+
+async def invalidate_weekly_summaries(dates: Optional[List[str]] = None, carries_forward: bool = False):
+    """Drop materialized summaries after a write to habits, meal plan, settings, workouts or metrics.
+    
+    Open weeks are always dropped. Closed weeks are dropped only if they contain one of `dates`,
+    or, for data that carries into later weeks (metrics), if they end on or after the earliest date.
+    """
+    global summary_generation
+    summary_generation += 1
+    conditions: List[Dict[str, Any]] = [{"closed": {"$ne": True}}]
+    if dates:
+        if carries_forward:
+            conditions.append({"week_end": {"$gte": min(dates)}})
+        else:
+            week_ids = {iso_week_id(datetime.strptime(d, "%Y-%m-%d")) for d in dates}
+            conditions.append({"_id": {"$in": sorted(week_ids)}})
+    await db.weekly_summaries.delete_many({"$or": conditions})
+
+async def load_summary_sources(first_date: str, last_date: str) -> Dict[str, Any]:
+    """Fetch everything the weekly summary reads for [first_date, last_date], with independent reads issued together"""
+    span_start = datetime.strptime(first_date, "%Y-%m-%d")
+    span_end = datetime.strptime(last_date, "%Y-%m-%d") + timedelta(days=1)
+    newest_first = [("timestamp", -1)]
+    habits_doc, plan_doc, settings_doc, workouts, metrics, previous_metric = await asyncio.gather(
+        db.habits.find_one({"_id": "user_habits"}),
+        db.meal_plan.find_one({"_id": "user_meal_plan"}),
+        db.settings.find_one({"_id": "user_settings"}),
+        db.workouts.find({"date": {"$gte": first_date, "$lte": last_date}}, {"_id": 0}).sort("date", 1).to_list(None),
+        db.metrics.find({"timestamp": {"$gte": span_start, "$lt": span_end}}, {"_id": 0}).sort(newest_first).to_list(None),
+        # Latest reading before the span: the baseline for its first week
+        db.metrics.find_one({"timestamp": {"$lt": span_start}}, {"_id": 0}, sort=newest_first)
+    )
+    return {
+        "habits": habits_doc.get("habits", {}) if habits_doc else {},
+        "meals": plan_doc.get("meals", []) if plan_doc else [],
+        "settings": settings_doc or {},
+        "workouts": workouts,
+        "metrics": metrics + ([previous_metric] if previous_metric else [])
+    }
+
+def build_weekly_summary(week_start: datetime, sources: Dict[str, Any]) -> Dict[str, Any]:
+    """Compute summary stats for the week starting on week_start (a Monday) from preloaded sources"""
     # Generate date range for the week
     week_dates = [(week_start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+    week_end_str = week_dates[-1]
     
-    # Get habits for the week
-    habits_doc = await db.habits.find_one({"_id": "user_habits"})
-    habits = habits_doc.get("habits", {}) if habits_doc else {}
+    # Habits for the week
+    habits = sources["habits"]
     
     habits_completed = sum(1 for d in week_dates if habits.get(d, False))
     habit_streak = 0
@@ -1291,27 +2125,23 @@ async def get_weekly_summary():
         else:
             break
     
-    # Get meal plan stats
-    plan_doc = await db.meal_plan.find_one({"_id": "user_meal_plan"})
-    meals = plan_doc.get("meals", []) if plan_doc else []
-    
-    week_meals = [m for m in meals if m["date"] in week_dates]
-    meals_planned = len(week_meals)
-    meals_prepped = sum(1 for m in week_meals if m.get("is_prepped", False))
-    
-    # Calculate daily nutrition from planned meals
-    daily_nutrition = {}
-    for date in week_dates:
-        day_meals = [m for m in week_meals if m["date"] == date]
-        daily_nutrition[date] = {
-            "calories": sum(m.get("calories", 0) for m in day_meals),
-            "protein": sum(m.get("protein", 0) for m in day_meals)
-        }
+    # Meal plan stats and daily nutrition, grouped in a single pass
+    daily_nutrition = {date: {"calories": 0, "protein": 0} for date in week_dates}
+    meals_planned = 0
+    meals_prepped = 0
+    for m in sources["meals"]:
+        day = daily_nutrition.get(m["date"])
+        if day is None:
+            continue
+        meals_planned += 1
+        if m.get("is_prepped", False):
+            meals_prepped += 1
+        day["calories"] += m.get("calories", 0)
+        day["protein"] += m.get("protein", 0)
     
-    # Get settings for targets
-    settings_doc = await db.settings.find_one({"_id": "user_settings"})
-    calorie_target = settings_doc.get("calorie_target", 2400) if settings_doc else 2400
-    protein_target = settings_doc.get("protein_target", 200) if settings_doc else 200
+    # Settings for targets
+    calorie_target = sources["settings"].get("calorie_target", 2400)
+    protein_target = sources["settings"].get("protein_target", 200)
     
     # Calculate days on target (within 10%)
     days_calorie_target = sum(1 for d in daily_nutrition.values() 
@@ -1319,21 +2149,16 @@ async def get_weekly_summary():
     days_protein_target = sum(1 for d in daily_nutrition.values() 
                               if d["protein"] >= protein_target * 0.9)
     
-    # Get workout stats
-    workouts = await db.workouts.find({"date": {"$in": week_dates}}, {"_id": 0}).to_list(100)
+    # Workout stats
+    workouts = [w for w in sources["workouts"] if week_dates[0] <= w["date"] <= week_end_str]
     workouts_completed = len(workouts)
     total_workout_minutes = sum(w.get("duration_minutes", 0) for w in workouts)
     
-    # Get metrics progress
-    metrics = await db.metrics.find({}, {"_id": 0}).sort("timestamp", -1).to_list(10)
+    # Metrics progress as of the end of this week (metrics are sorted newest first; Mongo timestamps are naive UTC)
+    week_end = week_start + timedelta(days=7)
+    metrics = [m for m in sources["metrics"] if m["timestamp"] < week_end]
     latest_metric = metrics[0] if metrics else None
-    week_ago_metric = None
-    for m in metrics:
-        if m.get("timestamp"):
-            metric_date = datetime.fromisoformat(m["timestamp"].replace("Z", "+00:00")) if isinstance(m["timestamp"], str) else m["timestamp"]
-            if metric_date < week_start:
-                week_ago_metric = m
-                break
+    week_ago_metric = next((m for m in metrics if m["timestamp"] < week_start), None)
     
     weight_change = None
     bf_change = None
@@ -1342,8 +2167,9 @@ async def get_weekly_summary():
         bf_change = round(latest_metric.get("body_fat", 0) - week_ago_metric.get("body_fat", 0), 1)
     
     return {
+        "week": iso_week_id(week_start),
         "week_start": week_start.strftime("%Y-%m-%d"),
-        "week_end": (week_start + timedelta(days=6)).strftime("%Y-%m-%d"),
+        "week_end": week_end_str,
         "habits": {
             "completed": habits_completed,
             "total": 7,
@@ -1375,6 +2201,77 @@ async def get_weekly_summary():
         }
     }
 
+async def get_weekly_summaries(week_starts: List[datetime]) -> List[Dict[str, Any]]:
+    """Summaries for the given week starts: stored documents where available, the rest computed from one batch of reads"""
+    week_ids = [iso_week_id(w) for w in week_starts]
+    stored = {
+        doc["_id"]: doc
+        for doc in await db.weekly_summaries.find({"_id": {"$in": week_ids}}).to_list(None)
+    }
+    missing = [w for w, week_id in zip(week_starts, week_ids) if week_id not in stored]
+    
+    if missing:
+        generation = summary_generation
+        first_date = min(missing).strftime("%Y-%m-%d")
+        last_date = (max(missing) + timedelta(days=6)).strftime("%Y-%m-%d")
+        sources = await load_summary_sources(first_date, last_date)
+        today_str = datetime.now().strftime("%Y-%m-%d")
+        ops = []
+        for week_start in missing:
+            summary = build_weekly_summary(week_start, sources)
+            summary["closed"] = summary["week_end"] < today_str
+            stored[summary["week"]] = summary
+            ops.append(UpdateOne({"_id": summary["week"]}, {"$set": summary}, upsert=True))
+        # Skip storing if a write invalidated summaries while we were computing
+        if generation == summary_generation:
+            await db.weekly_summaries.bulk_write(ops, ordered=False)
+    
+    return [{k: v for k, v in stored[week_id].items() if k != "_id"} for week_id in week_ids]
+
+@api_router.get("/summary/weekly")
+async def get_weekly_summary(week: Optional[str] = None):
+    """Get comprehensive weekly summary stats for the current week or ?week=YYYY-Www"""
+    week_start = parse_iso_week(week) if week else current_week_start()
+    summaries = await get_weekly_summaries([week_start])
+    return summaries[0]
+
+@api_router.get("/summary/range")
+async def get_summary_range(start: str, end: Optional[str] = None):
+    """Get weekly summaries and span totals for ISO weeks start..end (inclusive, end defaults to this week)"""
+    first = parse_iso_week(start)
+    last = parse_iso_week(end) if end else current_week_start()
+    if last < first:
+        raise HTTPException(status_code=400, detail="end week is before start week")
+    week_count = (last - first).days // 7 + 1
+    if week_count > MAX_SUMMARY_RANGE_WEEKS:
+        raise HTTPException(status_code=400, detail=f"Range too long (max {MAX_SUMMARY_RANGE_WEEKS} weeks)")
+    
+    weeks = await get_weekly_summaries([first + timedelta(weeks=i) for i in range(week_count)])
+    
+    habits_completed = sum(w["habits"]["completed"] for w in weeks)
+    meals_planned = sum(w["meals"]["planned"] for w in weeks)
+    meals_prepped = sum(w["meals"]["prepped"] for w in weeks)
+    weights = [w["body_progress"]["current_weight"] for w in weeks if w["body_progress"]["current_weight"] is not None]
+    body_fats = [w["body_progress"]["current_bf"] for w in weeks if w["body_progress"]["current_bf"] is not None]
+    
+    return {
+        "start": weeks[0]["week_start"],
+        "end": weeks[-1]["week_end"],
+        "weeks": weeks,
+        "totals": {
+            "weeks": week_count,
+            "habits_completed": habits_completed,
+            "habit_rate": round(habits_completed / (7 * week_count) * 100),
+            "meals_planned": meals_planned,
+            "meals_prepped": meals_prepped,
+            "prep_rate": round(meals_prepped / meals_planned * 100) if meals_planned > 0 else 0,
+            "workouts_completed": sum(w["workouts"]["completed"] for w in weeks),
+            "workout_minutes": sum(w["workouts"]["total_minutes"] for w in weeks),
+            "weight_change": round(weights[-1] - weights[0], 1) if len(weights) > 1 else None,
+            "bf_change": round(body_fats[-1] - body_fats[0], 1) if len(body_fats) > 1 else None
+        }
+    }
+
 @api_router.post("/ai/weekly-coaching")
 async def get_weekly_coaching():
     """Get AI-generated weekly coaching feedback based on stats"""
@@ -1396,8 +2293,16 @@ async def get_weekly_coaching():
 
 Provide brief, impactful coaching feedback."""
     
-    response = await get_ai_response(prompt, system_message)
-    return {"coaching": response, "summary": summary}
+    # Fingerprint only the fields used in the prompt; the LLM is called again when they change
+    coaching_inputs = {
+        "habits": [summary['habits']['completed'], summary['habits']['rate']],
+        "meals": [summary['meals']['prepped'], summary['meals']['planned'], summary['meals']['prep_rate']],
+        "workouts": [summary['workouts']['completed'], summary['workouts']['total_minutes']],
+        "body": [summary['body_progress']['weight_change'], summary['body_progress']['bf_change']]
+    }
+    # One cache entry per ISO week, so earlier weeks' coaching is kept
+    result = await get_cached_ai_response(f"weekly_coaching:{summary['week']}", coaching_inputs, prompt, system_message)
+    return {"coaching": result["response"], "summary": summary, "cached": result["cached"]}
 
 # ========== WORKOUT TRACKING ==========
 
@@ -1407,6 +2312,181 @@ async def get_workouts(limit: int = 20):
     workouts = await db.workouts.find({}, {"_id": 0}).sort("date", -1).to_list(limit)
     return {"workouts": workouts}
 
+# Training load: one training_load doc per day plus a state doc with the rolling
+# acute (7-day) and chronic (28-day) sums as of a date
+
+async def update_training_load(date: str, workout: Optional[Dict[str, Any]]):
+    """Refresh the day's load after a workout write and apply the change to the rolling sums"""
+    previous = await db.training_load.find_one({"_id": date})
+    if workout:
+        day = day_load_doc(workout)
+        await db.training_load.update_one({"_id": date}, {"$set": day}, upsert=True)
+    else:
+        day = {"load": 0}
+        await db.training_load.delete_one({"_id": date})
+    delta = day["load"] - (previous["load"] if previous else 0)
+    
+    state = await db.training_load_state.find_one({"_id": "user_training_load"})
+    if not state:
+        return
+    if workout and (not state.get("first_date") or date < state["first_date"]):
+        await db.training_load_state.update_one({"_id": "user_training_load"}, {"$min": {"first_date": date}})
+    elif not workout and date == state.get("first_date"):
+        first = await db.training_load.find_one({}, {"_id": 1}, sort=[("_id", 1)])
+        await db.training_load_state.update_one(
+            {"_id": "user_training_load"}, {"$set": {"first_date": first["_id"] if first else None}}
+        )
+    if not delta or date > state["as_of"]:
+        return
+    inc = {}
+    if date >= window_start(state["as_of"], ACUTE_DAYS):
+        inc["acute"] = delta
+    if date >= window_start(state["as_of"], CHRONIC_DAYS):
+        inc["chronic"] = delta
+    if inc:
+        await db.training_load_state.update_one({"_id": "user_training_load", "as_of": state["as_of"]}, {"$inc": inc})
+
+async def rebuild_training_load():
+    """Rebuild every per-day load doc from the workouts collection"""
+    workouts = await db.workouts.find({}, {"_id": 0}).to_list(None)
+    ops = [ReplaceOne({"_id": w["date"]}, day_load_doc(w), upsert=True) for w in workouts]
+    await db.training_load.delete_many({"_id": {"$nin": [w["date"] for w in workouts]}})
+    if ops:
+        await db.training_load.bulk_write(ops, ordered=False)
+    await db.training_load_state.delete_one({"_id": "user_training_load"})
+
+async def get_training_load_state() -> Dict[str, Any]:
+    """Rolling acute/chronic sums as of today; rolled forward from at most 28 day docs when the date changes"""
+    today = datetime.now().strftime("%Y-%m-%d")
+    state = await db.training_load_state.find_one({"_id": "user_training_load"})
+    if state and state.get("backfilled") and state["as_of"] == today:
+        return state
+    if not state or not state.get("backfilled"):
+        # First use: derive day docs from the whole workout history. Workout writes
+        # may already have created some day docs, so only this flag says history is loaded.
+        await rebuild_training_load()
+    
+    acute_start = window_start(today, ACUTE_DAYS)
+    first = await db.training_load.find_one({}, {"_id": 1}, sort=[("_id", 1)])
+    days = await db.training_load.find(
+        {"_id": {"$gte": window_start(today, CHRONIC_DAYS), "$lte": today}}
+    ).to_list(CHRONIC_DAYS)
+    state = {
+        "_id": "user_training_load",
+        "as_of": today,
+        "acute": sum(d["load"] for d in days if d["_id"] >= acute_start),
+        "chronic": sum(d["load"] for d in days),
+        "first_date": first["_id"] if first else None,
+        "backfilled": True
+    }
+    await db.training_load_state.replace_one({"_id": "user_training_load"}, state, upsert=True)
+    return state
+
+@api_router.get("/workouts/load")
+async def get_training_load(days: int = 28):
+    """Daily training load series with acute:chronic workload ratio and deload advice"""
+    days = max(1, min(365, days))
+    state = await get_training_load_state()
+    start = window_start(state["as_of"], days)
+    day_docs = {
+        d["_id"]: d
+        for d in await db.training_load.find({"_id": {"$gte": start, "$lte": state["as_of"]}}).to_list(days)
+    }
+    series = []
+    for i in range(days):
+        date = (datetime.strptime(start, "%Y-%m-%d") + timedelta(days=i)).strftime("%Y-%m-%d")
+        d = day_docs.get(date, {})
+        series.append({
+            "date": date,
+            "load": d.get("load", 0),
+            "volume": d.get("volume", 0),
+            "duration_minutes": d.get("duration_minutes", 0)
+        })
+    return {
+        "as_of": state["as_of"],
+        "acute_load": state["acute"],
+        "chronic_load": state["chronic"],
+        **acwr_status(state["acute"], state["chronic"], history_days(state.get("first_date"), state["as_of"])),
+        "series": series
+    }
+
+@api_router.post("/workouts/load/rebuild")
+async def rebuild_training_load_endpoint():
+    """Rebuild daily training load from all workouts (e.g. after importing history)"""
+    await rebuild_training_load()
+    state = await get_training_load_state()
+    return {
+        "success": True,
+        **acwr_status(state["acute"], state["chronic"], history_days(state.get("first_date"), state["as_of"]))
+    }
+
+# Weekly volume per muscle group, grouped server-side. Exercise names are matched
+# case-insensitively against the exercise_muscle_groups collection.
+
+async def seed_exercise_muscle_groups():
+    """Insert the default mapping for BEAST_SCHEDULE lifts without overwriting user edits"""
+    ops = [
+        UpdateOne({"_id": name}, {"$setOnInsert": {"muscle_group": group}}, upsert=True)
+        for name, group in muscle_group_seed(BEAST_SCHEDULE).items()
+    ]
+    await db.exercise_muscle_groups.bulk_write(ops, ordered=False)
+
+@api_router.get("/workouts/muscle-groups")
+async def get_muscle_groups():
+    """Get the exercise -> muscle group mapping"""
+    mappings = await db.exercise_muscle_groups.find({}).sort("_id", 1).to_list(None)
+    return {"mappings": {m["_id"]: m["muscle_group"] for m in mappings}}
+
+@api_router.post("/workouts/muscle-groups")
+async def set_muscle_group(mapping: MuscleGroupMapping):
+    """Map an exercise name (case-insensitive) to a muscle group"""
+    await db.exercise_muscle_groups.update_one(
+        {"_id": mapping.exercise.strip().lower()},
+        {"$set": {"muscle_group": mapping.muscle_group.strip().lower()}},
+        upsert=True
+    )
+    return {"success": True}
+
+@api_router.get("/workouts/volume")
+async def get_muscle_group_volume(weeks: int = 12):
+    """Weekly sets and tonnage per muscle group for the last `weeks` ISO weeks, in one aggregation"""
+    weeks = max(1, min(260, weeks))
+    start = (current_week_start() - timedelta(weeks=weeks - 1)).strftime("%Y-%m-%d")
+    pipeline = [
+        {"$match": {"date": {"$gte": start}}},
+        {"$unwind": "$exercises"},
+        {"$lookup": {
+            "from": "exercise_muscle_groups",
+            "let": {"name": {"$toLower": {"$trim": {"input": "$exercises.exercise"}}}},
+            "pipeline": [{"$match": {"$expr": {"$eq": ["$_id", "$$name"]}}}],
+            "as": "mapping"
+        }},
+        {"$group": {
+            "_id": {
+                "week": {"$dateToString": {"format": "%G-W%V", "date": {"$dateFromString": {"dateString": "$date"}}}},
+                "muscle_group": {"$ifNull": [{"$arrayElemAt": ["$mapping.muscle_group", 0]}, "other"]}
+            },
+            "sets": {"$sum": "$exercises.sets"},
+            "tonnage": {"$sum": {"$multiply": ["$exercises.sets", "$exercises.reps", "$exercises.weight"]}}
+        }},
+        {"$group": {
+            "_id": "$_id.week",
+            "muscle_groups": {"$push": {"k": "$_id.muscle_group", "v": {"sets": "$sets", "tonnage": "$tonnage"}}},
+            "total_sets": {"$sum": "$sets"},
+            "total_tonnage": {"$sum": "$tonnage"}
+        }},
+        {"$project": {
+            "_id": 0,
+            "week": "$_id",
+            "muscle_groups": {"$arrayToObject": "$muscle_groups"},
+            "total_sets": 1,
+            "total_tonnage": 1
+        }},
+        {"$sort": {"week": 1}}
+    ]
+    volume = await db.workouts.aggregate(pipeline).to_list(None)
+    return {"start": start, "weeks": volume}
+
 @api_router.get("/workouts/{date}")
 async def get_workout_by_date(date: str):
     """Get workout for a specific date"""
@@ -1427,6 +2507,9 @@ async def log_workout(workout: WorkoutEntry):
         {"$set": workout_dict},
         upsert=True
     )
+    await invalidate_weekly_summaries([workout.date])
+    await update_training_load(workout.date, workout_dict)
+    await invalidate_analytics("workouts")
     
     return {"success": True, "workout": workout_dict}
 
@@ -1453,8 +2536,11 @@ async def add_exercise_to_workout(date: str, exercise: WorkoutSet):
             {"date": date},
             {"$set": {"exercises": exercises}}
         )
+    await invalidate_weekly_summaries([date])
     
     updated = await db.workouts.find_one({"date": date}, {"_id": 0})
+    await update_training_load(date, updated)
+    await invalidate_analytics("workouts")
     return {"success": True, "workout": updated}
 
 @api_router.delete("/workouts/{date}")
@@ -1463,16 +2549,31 @@ async def delete_workout(date: str):
     result = await db.workouts.delete_one({"date": date})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Workout not found")
+    await invalidate_weekly_summaries([date])
+    await update_training_load(date, None)
+    await invalidate_analytics("workouts")
     return {"success": True}
 
 @api_router.get("/workouts/progress/{exercise}")
-async def get_exercise_progress(exercise: str, limit: int = 10):
-    """Get progress history for a specific exercise"""
+async def get_exercise_progress(exercise: str, limit: int = 10, points: Optional[int] = None, series: str = "volume"):
+    """Get progress history for a specific exercise (latest `limit` sessions, or the whole
+    history downsampled to `points` on `series`)"""
+    if points is not None:
+        if series not in ("weight", "volume"):
+            raise HTTPException(status_code=400, detail="series must be 'weight' or 'volume'")
+        points = max(3, min(MAX_CHART_POINTS, points))
+        
+        async def compute():
+            history = await get_exercise_progress(exercise, limit=0)
+            rows = list(reversed(history["progress"]))
+            return {"exercise": exercise, "progress": list(reversed(downsample_rows(rows, series, points)))}
+        return await get_cached_analytics(f"lttb:exercise:{exercise.lower()}:{series}:{points}", "workouts", compute)
+    
     # Find all workouts containing this exercise
     workouts = await db.workouts.find(
         {"exercises.exercise": {"$regex": exercise, "$options": "i"}},
         {"_id": 0}
-    ).sort("date", -1).to_list(limit)
+    ).sort("date", -1).to_list(limit or None)
     
     progress = []
     for workout in workouts:
@@ -1507,6 +2608,44 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_ai_provider():
+    await ai_provider.startup()
+    logger.info(f"AI provider: {ai_provider.name}")
+
+@app.on_event("startup")
+async def startup_inventory_indexes():
+    await db.inventory.create_index("expiry_date")
+    await db.inventory.create_index("item")
+
+@app.on_event("startup")
+async def startup_muscle_groups():
+    await seed_exercise_muscle_groups()
+
+@app.on_event("startup")
+async def startup_metric_dates():
+    # Older clients stored locale date strings; rewrite them as YYYY-MM-DD from the timestamp
+    rows = await db.metrics.find(
+        {"date": {"$not": {"$regex": r"^\d{4}-\d{2}-\d{2}$"}}}, {"_id": 1, "timestamp": 1}
+    ).to_list(None)
+    fixed = {row["_id"]: timestamp_date(row["timestamp"]) for row in rows if isinstance(row.get("timestamp"), datetime)}
+    if fixed:
+        await db.metrics.bulk_write([UpdateOne({"_id": _id}, {"$set": {"date": d}}) for _id, d in fixed.items()], ordered=False)
+        await invalidate_weekly_summaries([min(fixed.values())], carries_forward=True)
+        await invalidate_analytics("metrics")
+        logger.info(f"Normalised dates for {len(fixed)} metrics")
+    state_doc = await db.tdee_state.find_one({"_id": "user_tdee"})
+    if fixed or (state_doc and not is_iso_date(state_doc["state"].get("last_date"))):
+        await replay_tdee_history()
+
+@app.on_event("startup")
+async def startup_body_fat_formula():
+    # Bring rows computed with an older formula version up to date
+    updated = await recompute_stored_body_fat(await get_height_inches(), only_stale=True)
+    if updated:
+        logger.info(f"Recomputed body fat for {updated} metrics (formula v{BODY_FAT_FORMULA_VERSION})")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
+    await ai_provider.aclose()
@@ -0,0 +1,133 @@
+# Training load and workload-ratio helpers for the workouts collection
+#
+# Load is tracked per day in the `training_load` collection and rolled into a
+# single state document holding the acute (7-day) and chronic (28-day) sums,
+# so the acute:chronic workload ratio and deload advice are a single read.
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+# Days of training history needed before the chronic sum is a meaningful base;
+# with less, a couple of sessions make the ratio look like a huge spike
+MIN_HISTORY_DAYS = 21
+# Load units per minute of session time, so conditioning work (rucking, zone 2)
+# counts alongside lifting tonnage (sets x reps x lbs)
+MINUTE_LOAD = 100
+
+# (upper ACWR bound, status, recommendation), checked in order
+ACWR_BANDS: List[Tuple[float, str, str]] = [
+    (0.8, "undertrained", "Load is well below your recent base. Build back up gradually."),
+    (1.3, "optimal", "Training load is in the sweet spot. Keep progressing."),
+    (1.5, "caution", "Load is climbing fast. Hold volume steady this week."),
+    (float("inf"), "deload", "Acute load far exceeds your base. Take a deload week (cut volume ~40-50%)."),
+]
+
+
+def session_volume(workout: Dict[str, Any]) -> float:
+    """Lifting tonnage for a session: sum of sets x reps x weight"""
+    return float(sum(
+        ex.get("sets", 0) * ex.get("reps", 0) * ex.get("weight", 0)
+        for ex in workout.get("exercises", [])
+    ))
+
+
+def session_load(workout: Dict[str, Any]) -> float:
+    """Training load for a session: tonnage plus duration-based load"""
+    return session_volume(workout) + workout.get("duration_minutes", 0) * MINUTE_LOAD
+
+
+def day_load_doc(workout: Dict[str, Any]) -> Dict[str, Any]:
+    """Per-day load document for the training_load collection"""
+    return {
+        "volume": session_volume(workout),
+        "duration_minutes": workout.get("duration_minutes", 0),
+        "load": session_load(workout)
+    }
+
+
+def window_start(as_of: str, days: int) -> str:
+    """First date (inclusive) of a `days`-long window ending on as_of"""
+    return (datetime.strptime(as_of, "%Y-%m-%d") - timedelta(days=days - 1)).strftime("%Y-%m-%d")
+
+
+def history_days(first_date: Optional[str], as_of: str) -> int:
+    """Days from the first logged session through as_of (0 with no history)"""
+    if not first_date:
+        return 0
+    return (datetime.strptime(as_of, "%Y-%m-%d") - datetime.strptime(first_date, "%Y-%m-%d")).days + 1
+
+
+def acwr_status(acute: float, chronic: float, days_of_history: int) -> Dict[str, Any]:
+    """Acute:chronic workload ratio (weekly-average normalised) and its band"""
+    chronic_weekly = chronic / (CHRONIC_DAYS / ACUTE_DAYS)
+    if chronic_weekly <= 0 or days_of_history < MIN_HISTORY_DAYS:
+        return {"acwr": None, "status": "insufficient_history",
+                "history_days": days_of_history, "min_history_days": MIN_HISTORY_DAYS,
+                "recommendation": "Log a few weeks of training to establish your base load."}
+    ratio = acute / chronic_weekly
+    for upper, status, recommendation in ACWR_BANDS:
+        if ratio < upper:
+            return {"acwr": round(ratio, 2), "status": status, "history_days": days_of_history,
+                    "recommendation": recommendation}
+
+
+# ==================== MUSCLE GROUPS ====================
+
+# Exercise -> muscle group. Seeded into the exercise_muscle_groups collection
+# (keyed by lower-cased name) so volume can be grouped inside Mongo.
+EXERCISE_MUSCLE_GROUPS = {
+    # BEAST_SCHEDULE lifts
+    "Hack Squat": "quads",
+    "Walking Lunges": "quads",
+    "Leg Extension": "quads",
+    "Hanging Leg Raise": "core",
+    "Floor Press": "chest",
+    "Chest Supported Row": "back",
+    "Seated DB OH Press": "shoulders",
+    "Face Pulls": "rear delts",
+    "Trap Bar Deadlift": "posterior chain",
+    "Romanian Deadlift": "posterior chain",
+    "Lying Leg Curl": "hamstrings",
+    "Cable Crunch": "core",
+    "Incline DB Press": "chest",
+    "Neutral Lat Pulldown": "back",
+    "Lateral Raise": "shoulders",
+    "Tricep Pushdowns": "arms",
+    "Bicep Curls": "arms",
+    # Workout logger suggestions
+    "Back Squat": "quads",
+    "Front Squat": "quads",
+    "Squat": "quads",
+    "Leg Press": "quads",
+    "Leg Curl": "hamstrings",
+    "Nordic Curls": "hamstrings",
+    "Calf Raises": "calves",
+    "Deadlift": "posterior chain",
+    "Hip Thrust": "glutes",
+    "Bench Press": "chest",
+    "Cable Flyes": "chest",
+    "Lateral Raises": "shoulders",
+    "Overhead Press": "shoulders",
+    "Shoulder Press": "shoulders",
+    "Pull-ups": "back",
+    "Barbell Row": "back",
+}
+
+
+def schedule_exercise_names(schedule: List[Dict[str, Any]]) -> List[str]:
+    """Exercise names from schedule tasks like 'Hack Squat: 3x8-10' or 'Tricep Pushdowns + Bicep Curls: 3x12'"""
+    names = []
+    for day in schedule:
+        for task in day.get("tasks", []):
+            if ":" not in task:
+                continue
+            names.extend(part.strip() for part in task.split(":", 1)[0].split("+"))
+    return names
+
+
+def muscle_group_seed(schedule: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Lower-cased exercise -> muscle group for every schedule lift plus the known extras"""
+    names = schedule_exercise_names(schedule) + list(EXERCISE_MUSCLE_GROUPS)
+    return {name.lower(): EXERCISE_MUSCLE_GROUPS[name] for name in names if name in EXERCISE_MUSCLE_GROUPS}
@@ -115,6 +115,23 @@ function App() {
     initializeNotifications();
   }, []);
   
+  // Live shopping list: apply changes made by anyone else shopping from the same list
+  useEffect(() => {
+    const events = new EventSource(`${API}/shopping-list/events`);
+    // Changes made while (re)connecting aren't replayed, so reload the list on every connect
+    events.onopen = () => {
+      axios.get(`${API}/shopping-list`).then(res => setShoppingList(res.data.items || [])).catch(() => {});
+    };
+    events.addEventListener('item_updated', (e) => {
+      const { item } = JSON.parse(e.data);
+      setShoppingList(prev => prev.map(existing => (existing.id === item.id ? { ...existing, ...item } : existing)));
+    });
+    events.addEventListener('list_replaced', (e) => {
+      setShoppingList(JSON.parse(e.data).items);
+    });
+    return () => events.close();
+  }, []);
+  
   // Check if onboarding needed after data loads
   useEffect(() => {
     if (!loading && mealPlan.length === 0 && !localStorage.getItem('beastHubOnboarded')) {
@@ -355,9 +372,9 @@ function App() {
     }
   };
 
-  const toggleShoppingItem = async (index) => {
+  const toggleShoppingItem = async (itemId) => {
     try {
-      const res = await axios.post(`${API}/shopping-list/toggle-purchased?item_index=${index}`);
+      const res = await axios.post(`${API}/shopping-list/toggle-purchased?item_id=${encodeURIComponent(itemId)}`);
       setShoppingList(res.data.items);
       // Reload inventory
       const invRes = await axios.get(`${API}/inventory`);
@@ -466,7 +483,8 @@ function App() {
         title: meal.name, 
         content: res.data.recipe,
         servings: res.data.servings,
-        serving_count: res.data.serving_count
+        serving_count: res.data.serving_count,
+        macros: res.data.structured?.macros
       });
     } catch (error) {
       setAiResponse({ title: "Error", content: "Failed to generate recipe. Please try again." });
@@ -511,14 +529,14 @@ function App() {
   const logMetrics = async (weight, waist, neck) => {
     try {
       const bf = (86.010 * Math.log10(waist - neck) - 70.041 * Math.log10(75) + 36.76).toFixed(1);
-      const today = new Date();
+      const now = new Date();
       const entry = {
-        date: today.toLocaleDateString(),
+        date: now.toISOString().split('T')[0],
         weight: parseFloat(weight),
         waist: parseFloat(waist),
         neck: parseFloat(neck),
         body_fat: parseFloat(bf),
-        timestamp: new Date().toISOString()
+        timestamp: now.toISOString()
       };
       
       await axios.post(`${API}/metrics`, entry);
@@ -1456,6 +1474,14 @@ function App() {
                   </p>
                 </div>
               )}
+              {aiResponse?.macros && (
+                <div className="mb-4 flex flex-wrap gap-2 text-xs" data-testid="recipe-macros">
+                  <span className="px-2 py-1 bg-emerald-500/20 text-emerald-400 rounded font-bold">{aiResponse.macros.calories ?? '?'} cal</span>
+                  <span className="px-2 py-1 bg-blue-500/20 text-blue-400 rounded font-bold">{aiResponse.macros.protein ?? '?'}g P</span>
+                  <span className="px-2 py-1 bg-amber-500/20 text-amber-400 rounded font-bold">{aiResponse.macros.carbs ?? '?'}g C</span>
+                  <span className="px-2 py-1 bg-red-500/20 text-red-400 rounded font-bold">{aiResponse.macros.fat ?? '?'}g F</span>
+                </div>
+              )}
               <FormattedAIResponse content={aiResponse?.content} />
             </>
           )}
@@ -1866,11 +1892,10 @@ function ShoppingListModal({ items, onToggle, onGenerate }) {
                 </h4>
                 <div className="space-y-1">
                   {categoryItems.map((item, idx) => {
-                    const globalIdx = items.indexOf(item);
                     return (
                       <button
-                        key={idx}
-                        onClick={() => onToggle(globalIdx)}
+                        key={item.id || idx}
+                        onClick={() => onToggle(item.id)}
                         className={`w-full flex items-center justify-between p-3 rounded-lg transition ${
                           item.purchased
                             ? 'bg-emerald-500/10 border border-emerald-500/30'
@@ -2013,7 +2038,7 @@ function InventoryModal({ inventory, setInventory }) {
     
     try {
       const res = await axios.post(`${BACKEND_URL}/api/inventory/add`, newItem);
-      setInventory(res.data.inventory);
+      setInventory(prev => [...prev, res.data.item]);
       setNewItem({ item: '', amount: '', category: 'Produce' });
       setShowAddForm(false);
     } catch (error) {
@@ -2030,7 +2055,10 @@ function InventoryModal({ inventory, setInventory }) {
         item: itemName,
         amount: editAmount
       });
-      setInventory(res.data.inventory);
+      setInventory(prev => {
+        const index = prev.findIndex(item => item.item === itemName);
+        return index < 0 ? prev : prev.map((item, i) => (i === index ? res.data.item : item));
+      });
       setEditingItem(null);
       setEditAmount('');
     } catch (error) {
@@ -2043,8 +2071,11 @@ function InventoryModal({ inventory, setInventory }) {
     if (!confirm(`Remove "${itemName}" from inventory?`)) return;
     
     try {
-      const res = await axios.delete(`${BACKEND_URL}/api/inventory/${encodeURIComponent(itemName)}`);
-      setInventory(res.data.inventory);
+      await axios.delete(`${BACKEND_URL}/api/inventory/${encodeURIComponent(itemName)}`);
+      setInventory(prev => {
+        const index = prev.findIndex(item => item.item === itemName);
+        return index < 0 ? prev : prev.filter((_, i) => i !== index);
+      });
     } catch (error) {
       console.error("Error deleting item:", error);
       alert(`Failed to delete item: ${error.response?.data?.detail || error.message}`);
@@ -0,0 +1,64 @@
+"""
+Test suite for the shared AI HTTP client
+- POST /api/ai/motivation - Concurrent AI calls share one pooled keep-alive client
+- EmergentProvider - startup() installs one shared client for litellm; aclose() closes it
+"""
+
+import pytest
+import requests
+import os
+import sys
+import asyncio
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# More concurrent calls than the default pool size (AI_POOL_SIZE=10)
+CONCURRENT_CALLS = 12
+
+
+def ask_for_motivation(context):
+    return requests.post(f"{BASE_URL}/api/ai/motivation", json={"context": context}, timeout=180)
+
+
+class TestPooledAIClient:
+    """Tests that AI calls keep working through the shared client"""
+
+    def test_concurrent_calls_all_succeed(self):
+        """Test that calls queue for a pooled connection instead of failing"""
+        contexts = [f"TEST_Pool call {i}" for i in range(CONCURRENT_CALLS)]
+        with ThreadPoolExecutor(max_workers=CONCURRENT_CALLS) as pool:
+            responses = list(pool.map(ask_for_motivation, contexts))
+        for response in responses:
+            assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+            assert response.json()["message"]
+
+    def test_client_survives_between_requests(self):
+        """Test that sequential calls reuse the client rather than a closed one"""
+        for i in range(3):
+            response = ask_for_motivation(f"TEST_Sequential call {i}")
+            assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+
+
+class TestClientLifecycle:
+    """Tests for EmergentProvider's shared client, run in-process"""
+
+    def test_startup_shares_one_client_until_aclose(self):
+        """Test that every litellm call gets the same pooled client, and that shutdown closes it"""
+        pytest.importorskip("emergentintegrations")
+        sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+        import litellm
+        from ai_providers import EmergentProvider
+
+        async def lifecycle():
+            provider = EmergentProvider("TEST_key", pool_size=2)
+            await provider.startup()
+            client = provider.http_client
+            assert client is not None and not client.is_closed
+            assert litellm.aclient_session is client
+            await provider.aclose()
+            assert client.is_closed
+            assert provider.http_client is None
+            assert litellm.aclient_session is None
+        asyncio.run(lifecycle())
@@ -0,0 +1,46 @@
+"""
+Test suite for fingerprint-cached AI responses
+- POST /api/ai/audit - Reused while its inputs are unchanged, regenerated after a new metric
+- POST /api/ai/weekly-coaching - Reused within the ISO week while the stats are unchanged
+"""
+
+import requests
+import os
+from datetime import datetime
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+def log_metric(weight):
+    return requests.post(f"{BASE_URL}/api/metrics", json={
+        "date": datetime.now().strftime("%Y-%m-%d"), "weight": weight, "waist": 36, "neck": 16, "body_fat": 0
+    })
+
+
+class TestAuditCache:
+    """Tests for /api/ai/audit caching"""
+
+    def test_repeat_audit_is_cached(self):
+        assert log_metric(214.2).status_code == 200
+        first = requests.post(f"{BASE_URL}/api/ai/audit")
+        assert first.status_code == 200, f"Expected 200, got {first.status_code}: {first.text}"
+        second = requests.post(f"{BASE_URL}/api/ai/audit").json()
+        assert second["cached"] == True
+        assert second["audit"] == first.json()["audit"]
+
+    def test_new_metric_regenerates_audit(self):
+        requests.post(f"{BASE_URL}/api/ai/audit")
+        assert log_metric(213.8).status_code == 200
+        assert requests.post(f"{BASE_URL}/api/ai/audit").json()["cached"] == False
+
+
+class TestCoachingCache:
+    """Tests for /api/ai/weekly-coaching caching"""
+
+    def test_coaching_is_reused_within_the_week(self):
+        first = requests.post(f"{BASE_URL}/api/ai/weekly-coaching")
+        assert first.status_code == 200, f"Expected 200, got {first.status_code}: {first.text}"
+        second = requests.post(f"{BASE_URL}/api/ai/weekly-coaching").json()
+        assert second["cached"] == True
+        assert second["coaching"] == first.json()["coaching"]
+        assert second["summary"]["week"] == first.json()["summary"]["week"]
@@ -0,0 +1,73 @@
+"""
+Test suite for Inventory Expiry
+- POST /api/inventory/add - expiry_date defaults from the category shelf life
+- GET /api/inventory/expiring?days= - Items (and prepped meals) expiring within the window
+"""
+
+import pytest
+import requests
+import os
+from datetime import datetime, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+def days_from_today(days):
+    return (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+@pytest.fixture
+def stocked():
+    """Add TEST_ rows and remove them afterwards"""
+    added = []
+
+    def add(item, category="Produce", expiry_date=None):
+        response = requests.post(f"{BASE_URL}/api/inventory/add", json={
+            "item": item, "amount": "1", "category": category, "expiry_date": expiry_date
+        })
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        added.append(item)
+        return response.json()["item"]
+    yield add
+    for item in added:
+        requests.delete(f"{BASE_URL}/api/inventory/{item}")
+
+
+def expiring(days):
+    response = requests.get(f"{BASE_URL}/api/inventory/expiring", params={"days": days})
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+    return response.json()
+
+
+class TestDefaultExpiry:
+    """Tests for auto-populated expiry dates"""
+
+    def test_expiry_defaults_from_category(self, stocked):
+        assert stocked("TEST_Expiry Produce", "Produce")["expiry_date"] == days_from_today(7)
+        assert stocked("TEST_Expiry Pantry", "Pantry")["expiry_date"] == days_from_today(180)
+
+    def test_explicit_expiry_is_kept(self, stocked):
+        assert stocked("TEST_Expiry Explicit", expiry_date=days_from_today(2))["expiry_date"] == days_from_today(2)
+
+
+class TestExpiringSoon:
+    """Tests for /api/inventory/expiring"""
+
+    def test_window_includes_only_items_up_to_cutoff(self, stocked):
+        stocked("TEST_Expiring Soon", expiry_date=days_from_today(2))
+        stocked("TEST_Expiring Later", expiry_date=days_from_today(10))
+
+        data = expiring(3)
+        assert data["cutoff"] == days_from_today(3)
+        names = [item["item"] for item in data["items"]]
+        assert "TEST_Expiring Soon" in names
+        assert "TEST_Expiring Later" not in names
+        assert "TEST_Expiring Soon" not in [item["item"] for item in expiring(1)["items"]]
+        dates = [item["expiry_date"] for item in data["items"]]
+        assert dates == sorted(dates)
+
+    def test_expired_items_are_flagged(self, stocked):
+        stocked("TEST_Expired Item", expiry_date=days_from_today(-1))
+        data = expiring(0)
+        assert "TEST_Expired Item" in data["expired"]
+        assert all(item["expiry_date"] < days_from_today(0) for item in data["items"] if item["item"] in data["expired"])
@@ -0,0 +1,50 @@
+"""
+Test suite for Inventory Forecast
+- GET /api/inventory/forecast - Run-out date, shortfall and expiry flags per item
+  against the saved meal plan (pantry spellings match plan ingredients)
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def forecast():
+    """Save a fresh 1-week plan and forecast it"""
+    plan = requests.post(f"{BASE_URL}/api/meal-plan/generate", json={"weeks": 1}).json()
+    requests.post(f"{BASE_URL}/api/meal-plan/save?weeks={plan['weeks']}", json=plan["meal_plan"])
+    response = requests.get(f"{BASE_URL}/api/inventory/forecast")
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+    return response.json()
+
+
+class TestInventoryForecast:
+    """Tests for /api/inventory/forecast"""
+
+    def test_runouts_fall_inside_the_plan(self, forecast):
+        for item in forecast["items"]:
+            if item["runs_out_on"]:
+                assert forecast["start"] <= item["runs_out_on"] <= forecast["end"]
+                assert item["shortfall"], f"{item['item']} runs out but has no shortfall"
+        assert forecast["running_out"] == [item["item"] for item in forecast["items"] if item["runs_out_on"]]
+
+    def test_pantry_spelling_counts_as_on_hand(self, forecast):
+        """Test that stock stored as "rolled oats" covers a plan that needs "Rolled Oats" """
+        short = next((item for item in forecast["items"] if item["shortfall"] and item["item"].lower() != item["item"]), None)
+        if short is None:
+            pytest.skip("No short item with a capitalised name")
+        variant = short["item"].lower()
+        requests.post(f"{BASE_URL}/api/inventory/add", json={
+            "item": variant, "amount": short["shortfall"], "category": "Pantry"
+        })
+        try:
+            items = requests.get(f"{BASE_URL}/api/inventory/forecast").json()["items"]
+            assert not any(item["item"] == variant for item in items), "Variant spelling forecast as a separate item"
+            covered = next(item for item in items if item["item"] == short["item"])
+            assert covered["shortfall"] is None
+            assert covered["runs_out_on"] is None
+        finally:
+            requests.delete(f"{BASE_URL}/api/inventory/{variant}")
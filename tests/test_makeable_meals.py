@@ -0,0 +1,56 @@
+"""
+Test suite for "What can I make now"
+- GET /api/meals/makeable - Library meals ranked by ingredients missing from inventory
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+def makeable(**params):
+    response = requests.get(f"{BASE_URL}/api/meals/makeable", params=params)
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+    return response.json()
+
+
+class TestMakeableMeals:
+    """Tests for /api/meals/makeable"""
+
+    def test_ranked_by_missing_count(self):
+        data = makeable()
+        counts = [meal["missing_count"] for meal in data["meals"]]
+        assert counts == sorted(counts)
+        for meal in data["meals"]:
+            assert meal["missing_count"] == len(meal["missing"])
+            assert meal["can_make"] == (meal["missing_count"] == 0)
+        assert data["makeable_count"] == sum(1 for meal in data["meals"] if meal["can_make"])
+
+    def test_category_filter(self):
+        data = makeable(category="breakfast")
+        assert data["meals"]
+        assert all(meal["category"] == "breakfast" for meal in data["meals"])
+
+    def test_unknown_category_returns_400(self):
+        response = requests.get(f"{BASE_URL}/api/meals/makeable", params={"category": "TEST_brunch"})
+        assert response.status_code == 400
+
+    def test_stocking_missing_items_makes_meal(self):
+        """Test that adding a meal's missing ingredients (any spelling case) makes it makeable"""
+        meal = next((m for m in makeable()["meals"] if not m["can_make"]), None)
+        if meal is None:
+            pytest.skip("Every meal is already makeable")
+        added = []
+        try:
+            for item in meal["missing"]:
+                name = item.lower()
+                requests.post(f"{BASE_URL}/api/inventory/add", json={"item": name, "amount": "1", "category": "Pantry"})
+                added.append(name)
+            ranked = next(m for m in makeable()["meals"] if m["id"] == meal["id"])
+            assert ranked["can_make"] == True
+            assert ranked["missing"] == []
+        finally:
+            for name in added:
+                requests.delete(f"{BASE_URL}/api/inventory/{name}")
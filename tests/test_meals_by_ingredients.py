@@ -0,0 +1,71 @@
+"""
+Test suite for "Use it up" suggestions
+- GET /api/meals/by-ingredients?items= - Meals ranked by how many of the items they use
+- GET /api/meals/by-ingredients - Without items, uses inventory expiring within ?days=
+"""
+
+import pytest
+import requests
+import os
+from datetime import datetime, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def library_meals():
+    library = requests.get(f"{BASE_URL}/api/meals/library/extended").json()
+    return {meal["id"]: meal for meals in library.values() for meal in meals}
+
+
+def by_ingredients(**params):
+    response = requests.get(f"{BASE_URL}/api/meals/by-ingredients", params=params)
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+    return response.json()
+
+
+class TestMealsByIngredients:
+    """Tests for explicit ?items="""
+
+    def test_every_suggestion_uses_the_item(self, library_meals):
+        item = next(meal for meal in library_meals.values() if meal.get("ingredients"))["ingredients"][0]["item"]
+        meals = by_ingredients(items=[item])["meals"]
+        assert meals
+        expected = {meal_id for meal_id, meal in library_meals.items()
+                    if any(ing["item"].lower() == item.lower() for ing in meal.get("ingredients", []))}
+        assert {meal["id"] for meal in meals} == expected
+
+    def test_matching_ignores_case(self, library_meals):
+        item = next(meal for meal in library_meals.values() if meal.get("ingredients"))["ingredients"][0]["item"]
+        exact = [meal["id"] for meal in by_ingredients(items=[item])["meals"]]
+        shouted = [meal["id"] for meal in by_ingredients(items=[f"  {item.upper()} "])["meals"]]
+        assert shouted == exact
+
+    def test_more_matches_rank_first(self, library_meals):
+        meal = max(library_meals.values(), key=lambda m: len(m.get("ingredients", [])))
+        items = [ing["item"] for ing in meal["ingredients"][:3]]
+        meals = by_ingredients(items=items)["meals"]
+        counts = [m["uses_count"] for m in meals]
+        assert counts == sorted(counts, reverse=True)
+        assert meals[0]["uses_count"] == len(set(i.lower() for i in items))
+
+    def test_unknown_category_returns_400(self):
+        response = requests.get(f"{BASE_URL}/api/meals/by-ingredients", params={"category": "TEST_brunch"})
+        assert response.status_code == 400
+
+
+class TestUseItUp:
+    """Tests for suggestions from expiring inventory"""
+
+    def test_expiring_item_drives_suggestions(self, library_meals):
+        item = next(meal for meal in library_meals.values() if meal.get("ingredients"))["ingredients"][0]["item"]
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        requests.post(f"{BASE_URL}/api/inventory/add", json={
+            "item": item, "amount": "1", "category": "Produce", "expiry_date": tomorrow
+        })
+        try:
+            data = by_ingredients(days=2)
+            assert item in data["items"]
+            assert any(item.lower() in [use.lower() for use in meal["uses"]] for meal in data["meals"])
+        finally:
+            requests.delete(f"{BASE_URL}/api/inventory/{item}")
@@ -0,0 +1,165 @@
+"""
+Test suite for Metrics Analytics
+- GET /api/metrics/trend - Smoothed trend, weekly rate, ETA to 12%
+- POST /api/metrics - Locale date strings are stored as YYYY-MM-DD
+- GET /api/metrics?points= - LTTB-downsampled history
+- POST /api/settings/height - Height setting + body fat recompute
+- POST /api/settings - Height range validated like /settings/height
+- GET /api/tdee - Adaptive TDEE estimate
+- POST /api/settings/calorie/complete - Partly logged days are left out of the TDEE filter
+- GET /api/projection - Monte Carlo body fat projection
+"""
+
+import pytest
+import requests
+import os
+import time
+from datetime import datetime, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module", autouse=True)
+def logged_metrics():
+    """Make sure a few metric entries exist"""
+    for i in range(3):
+        date = (datetime.now() - timedelta(days=7 * (2 - i))).strftime("%Y-%m-%d")
+        requests.post(f"{BASE_URL}/api/metrics", json={
+            "date": date, "weight": 220 - i, "waist": 38 - 0.5 * i, "neck": 16, "body_fat": 0
+        })
+
+
+class TestMetricsTrend:
+    """Tests for /api/metrics/trend"""
+
+    def test_trend_returns_series_and_summary(self):
+        """Test that trend has one row per metric and a summary"""
+        response = requests.get(f"{BASE_URL}/api/metrics/trend")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+
+        data = response.json()
+        assert len(data["series"]) >= 3
+        row = data["series"][-1]
+        for field in ["weight_smoothed", "bf_smoothed", "weight_rate_per_week", "bf_rate_per_week"]:
+            assert field in row, f"Missing series field {field}"
+        assert data["summary"]["goal_bf"] == 12.0
+        assert "eta_date" in data["summary"]
+
+    def test_trend_refreshes_after_new_metric(self):
+        """Test that the cached trend is invalidated by add_metric"""
+        before = requests.get(f"{BASE_URL}/api/metrics/trend").json()["summary"]["entries"]
+        requests.post(f"{BASE_URL}/api/metrics", json={
+            "date": datetime.now().strftime("%Y-%m-%d"), "weight": 217, "waist": 36.5, "neck": 16, "body_fat": 0
+        })
+        after = requests.get(f"{BASE_URL}/api/metrics/trend").json()["summary"]["entries"]
+        assert after == before + 1
+
+
+class TestMetricDates:
+    """Tests for metric date normalisation"""
+
+    def test_locale_date_is_stored_as_iso(self):
+        """Test that repeated weigh-ins with a locale date (as older clients sent) save and get an ISO date"""
+        now = datetime.utcnow()
+        for _ in range(2):
+            response = requests.post(f"{BASE_URL}/api/metrics", json={
+                "date": now.strftime("%m/%d/%Y"), "weight": 217, "waist": 36.5, "neck": 16, "body_fat": 0,
+                "timestamp": now.isoformat() + "Z"
+            })
+            assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+            assert response.json()["date"] == now.strftime("%Y-%m-%d")
+        assert requests.get(f"{BASE_URL}/api/tdee").status_code == 200
+        assert requests.get(f"{BASE_URL}/api/metrics/trend").status_code == 200
+
+    def test_downsampled_metrics_keep_timestamp_order(self):
+        """Test that ?points= downsamples on timestamps and returns newest first"""
+        response = requests.get(f"{BASE_URL}/api/metrics", params={"points": 3})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        timestamps = [m["timestamp"] for m in response.json()]
+        assert 0 < len(timestamps) <= 3
+        assert timestamps == sorted(timestamps, reverse=True)
+
+
+class TestBodyFatRecompute:
+    """Tests for server-side Navy body fat"""
+
+    def test_add_metric_computes_body_fat(self):
+        """Test that body fat is computed from waist/neck, not taken from the client"""
+        response = requests.post(f"{BASE_URL}/api/metrics", json={
+            "date": datetime.now().strftime("%Y-%m-%d"), "weight": 217, "waist": 36, "neck": 15, "body_fat": 99
+        })
+        assert response.status_code == 200
+        assert response.json()["body_fat"] != 99
+
+    def test_set_height_recomputes_history(self):
+        """Test that changing height rewrites stored body fat"""
+        requests.post(f"{BASE_URL}/api/settings/height", params={"height_inches": 75})
+        tall = requests.get(f"{BASE_URL}/api/metrics").json()[0]["body_fat"]
+
+        response = requests.post(f"{BASE_URL}/api/settings/height", params={"height_inches": 70})
+        assert response.status_code == 200
+        assert response.json()["metrics_updated"] >= 1
+        short = requests.get(f"{BASE_URL}/api/metrics").json()[0]["body_fat"]
+        assert short > tall, "Shorter height should give higher body fat for the same girths"
+
+        requests.post(f"{BASE_URL}/api/settings/height", params={"height_inches": 75})
+
+    def test_invalid_height_returns_400(self):
+        response = requests.post(f"{BASE_URL}/api/settings/height", params={"height_inches": 10})
+        assert response.status_code == 400
+
+    def test_invalid_height_in_settings_returns_400(self):
+        """Test that /api/settings applies the same height range and stores nothing"""
+        settings = requests.get(f"{BASE_URL}/api/settings").json()
+        response = requests.post(f"{BASE_URL}/api/settings", json={**settings, "height_inches": -5})
+        assert response.status_code == 400
+        assert requests.get(f"{BASE_URL}/api/settings").json()["height_inches"] == settings["height_inches"]
+
+
+class TestTdeeAndProjection:
+    """Tests for /api/tdee and /api/projection"""
+
+    def test_tdee_has_recommendation(self):
+        response = requests.get(f"{BASE_URL}/api/tdee")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        data = response.json()
+        assert data["tdee_range"][0] <= data["tdee"] <= data["tdee_range"][1]
+        assert data["recommended_calorie_target"] < data["tdee"]
+
+    def test_partial_calorie_day_is_ignored_until_marked_complete(self):
+        """Test that a day logged far below TDEE only feeds the estimate once flagged complete"""
+        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        complete = f"{BASE_URL}/api/settings/calorie/complete"
+        response = requests.post(complete, params={"date": yesterday, "complete": False})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        partial = requests.post(f"{BASE_URL}/api/tdee/rebuild").json()
+        if response.json()["calories"] >= partial["tdee"] / 2:
+            pytest.skip("Yesterday is already logged as a full day")
+
+        try:
+            assert requests.post(complete, params={"date": yesterday}).json()["complete"] == True
+            flagged = requests.post(f"{BASE_URL}/api/tdee/rebuild").json()
+            # A complete day far below maintenance with no matching weight drop means lower TDEE
+            assert flagged["tdee"] < partial["tdee"]
+        finally:
+            requests.post(complete, params={"date": yesterday, "complete": False})
+            requests.post(f"{BASE_URL}/api/tdee/rebuild")
+
+    def test_projection_bands_are_ordered(self):
+        """Test that percentile bands are monotonic for every week"""
+        start = time.time()
+        response = requests.get(f"{BASE_URL}/api/projection", params={"deficit": 500, "seed": 1})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        print(f"Projection round trip: {(time.time() - start) * 1000:.0f}ms")
+
+        data = response.json()
+        assert data["weeks"] == 209
+        for week in data["series"]:
+            assert week["p10"] <= week["p25"] <= week["p50"] <= week["p75"] <= week["p90"]
+        assert 0 <= data["probability_reach_goal"] <= 1
+
+    def test_projection_is_deterministic_with_seed(self):
+        params = {"deficit": 400, "weeks": 52, "samples": 1000, "seed": 7}
+        first = requests.get(f"{BASE_URL}/api/projection", params=params).json()
+        second = requests.get(f"{BASE_URL}/api/projection", params=params).json()
+        assert first["series"] == second["series"]
@@ -0,0 +1,79 @@
+"""
+Test suite for Muscle Group Volume
+- GET /api/workouts/muscle-groups - Exercise -> muscle group mapping (seeded from the schedule)
+- POST /api/workouts/muscle-groups - Case-insensitive mapping edits
+- GET /api/workouts/volume - Weekly sets and tonnage per muscle group
+"""
+
+import pytest
+import requests
+import os
+from datetime import datetime, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+TEST_EXERCISE = "TEST_Volume Curl"
+TEST_GROUP = "test_arms"
+
+
+def current_week_id():
+    year, week, _ = datetime.now().isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+@pytest.fixture
+def free_date_this_week():
+    """A date in the current ISO week, up to today, with no workout logged"""
+    today = datetime.now()
+    for offset in range(today.weekday() + 1):
+        date = (today - timedelta(days=offset)).strftime("%Y-%m-%d")
+        if requests.get(f"{BASE_URL}/api/workouts/{date}").json()["workout"] is None:
+            yield date
+            requests.delete(f"{BASE_URL}/api/workouts/{date}")
+            return
+    pytest.skip("No free date this week")
+
+
+class TestMuscleGroupMapping:
+    """Tests for /api/workouts/muscle-groups"""
+
+    def test_mapping_is_seeded(self):
+        response = requests.get(f"{BASE_URL}/api/workouts/muscle-groups")
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        assert response.json()["mappings"]
+
+    def test_mapping_is_case_insensitive(self):
+        response = requests.post(f"{BASE_URL}/api/workouts/muscle-groups", json={
+            "exercise": f"  {TEST_EXERCISE.upper()} ", "muscle_group": TEST_GROUP.upper()
+        })
+        assert response.status_code == 200
+        mappings = requests.get(f"{BASE_URL}/api/workouts/muscle-groups").json()["mappings"]
+        assert mappings[TEST_EXERCISE.lower()] == TEST_GROUP
+
+
+class TestWeeklyVolume:
+    """Tests for /api/workouts/volume"""
+
+    def test_workout_adds_sets_and_tonnage(self, free_date_this_week):
+        requests.post(f"{BASE_URL}/api/workouts/muscle-groups", json={"exercise": TEST_EXERCISE, "muscle_group": TEST_GROUP})
+
+        def this_week():
+            weeks = requests.get(f"{BASE_URL}/api/workouts/volume", params={"weeks": 1}).json()["weeks"]
+            return next((w for w in weeks if w["week"] == current_week_id()), None)
+        before = this_week()
+        before_sets = before["total_sets"] if before else 0
+
+        requests.post(f"{BASE_URL}/api/workouts", json={
+            "date": free_date_this_week,
+            "workout_type": "TEST_Volume",
+            # Different case and spacing still map to the same group
+            "exercises": [{"exercise": f" {TEST_EXERCISE.lower()}", "sets": 3, "reps": 10, "weight": 50.0}],
+            "duration_minutes": 20
+        })
+        week = this_week()
+        assert week["muscle_groups"][TEST_GROUP] == {"sets": 3, "tonnage": 1500}
+        assert week["total_sets"] == before_sets + 3
+
+    def test_weeks_are_sorted(self):
+        weeks = requests.get(f"{BASE_URL}/api/workouts/volume", params={"weeks": 12}).json()["weeks"]
+        assert [w["week"] for w in weeks] == sorted(w["week"] for w in weeks)
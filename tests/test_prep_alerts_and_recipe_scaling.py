@@ -10,6 +10,7 @@ P2: Recipe Scaling
   - Recipe endpoint accepts servings parameter (individual/family)
   - Individual servings returns correct serving_count
   - Family servings returns correct serving_count
+  - Numeric servings ("3") scale the ingredients and serving_count
 """
 
 import pytest
@@ -260,6 +261,69 @@ class TestRecipeScalingP2:
         print(f"✓ Recipe with meal_id uses meal-specific serving size: {data['serving_count']}")
 
 
+    def test_recipe_numeric_servings(self, api_client):
+        """Test that a numeric servings value is used as the serving count and for the ingredients"""
+        library = api_client.get(f"{BASE_URL}/api/meals/library/extended").json()
+        meal = next(meal for meals in library.values() for meal in meals if meal.get("ingredients"))
+        payload = {
+            "meal_name": meal["name"],
+            "meal_blueprint": meal.get("blueprint", ""),
+            "category": meal["category"],
+            "servings": "3",
+            "meal_id": meal["id"]
+        }
+        response = api_client.post(f"{BASE_URL}/api/ai/recipe", json={**payload, "regenerate": True})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        data = response.json()
+        assert data["serving_count"] == 3
+
+        scaled = api_client.get(f"{BASE_URL}/api/meals/{meal['id']}/ingredients", params={"servings": "3"}).json()
+        assert data["structured"]["ingredients"] == scaled["ingredients"]
+
+    def test_recipe_invalid_servings_returns_400(self, api_client):
+        payload = {"meal_name": "Beast Oats", "meal_blueprint": "", "category": "breakfast", "servings": "lots"}
+        response = api_client.post(f"{BASE_URL}/api/ai/recipe", json=payload)
+        assert response.status_code == 400
+
+
+class TestLocalIngredientScaling:
+    """Tests for /api/meals/{meal_id}/ingredients and portion changes without the AI"""
+
+    @pytest.fixture
+    def meal(self, api_client):
+        library = api_client.get(f"{BASE_URL}/api/meals/library/extended").json()
+        return next(meal for meals in library.values() for meal in meals
+                    if meal.get("ingredients") and meal.get("family_servings", 4) != meal.get("dad_servings", 1))
+
+    def test_scaled_ingredients_by_mode(self, api_client, meal):
+        individual = api_client.get(f"{BASE_URL}/api/meals/{meal['id']}/ingredients").json()
+        family = api_client.get(f"{BASE_URL}/api/meals/{meal['id']}/ingredients", params={"servings": "family"}).json()
+        assert individual["serving_count"] == meal.get("dad_servings", 1)
+        assert family["serving_count"] == meal.get("family_servings", 4)
+        assert [i["item"] for i in family["ingredients"]] == [i["item"] for i in individual["ingredients"]]
+        assert [i["amount"] for i in family["ingredients"]] != [i["amount"] for i in individual["ingredients"]]
+
+    def test_family_reuses_individual_narrative(self, api_client, meal):
+        """Test that switching to family scales locally and keeps amount-free steps"""
+        payload = {
+            "meal_name": meal["name"],
+            "meal_blueprint": meal.get("blueprint", ""),
+            "category": meal["category"],
+            "meal_id": meal["id"]
+        }
+        individual = api_client.post(f"{BASE_URL}/api/ai/recipe", json={**payload, "servings": "individual"}).json()
+        family = api_client.post(f"{BASE_URL}/api/ai/recipe", json={**payload, "servings": "family"}).json()
+        scaled = api_client.get(f"{BASE_URL}/api/meals/{meal['id']}/ingredients", params={"servings": "family"}).json()
+        assert family["structured"]["ingredients"] == scaled["ingredients"]
+        assert family["serving_count"] == meal.get("family_servings", 4)
+        if family["cached"] and individual["cached"]:
+            assert family["structured"]["macros"] == individual["structured"]["macros"]
+
+    def test_unknown_meal_returns_404(self, api_client):
+        response = api_client.get(f"{BASE_URL}/api/meals/TEST_no_such_meal/ingredients")
+        assert response.status_code == 404
+
+
 class TestMealLibraryServingInfo:
     """Test that meal library contains serving size information"""
     
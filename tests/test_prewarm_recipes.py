@@ -0,0 +1,49 @@
+"""
+Test suite for the recipe pre-warm CLI
+- backend/prewarm_recipes.py - Stores individual and family recipes for library meals
+- GET /api/recipes/{meal_id} - Records exist afterwards; a rerun skips them
+"""
+
+import pytest
+import requests
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def run_prewarm(*args):
+    return subprocess.run(
+        [sys.executable, "prewarm_recipes.py", *args],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=600
+    )
+
+
+@pytest.fixture(scope="module")
+def meal_id():
+    if not (BACKEND_DIR / ".env").exists() and "MONGO_URL" not in os.environ:
+        pytest.skip("CLI needs the backend environment (backend/.env or MONGO_URL)")
+    library = requests.get(f"{BASE_URL}/api/meals/library/extended").json()
+    return next(meal["id"] for meals in library.values() for meal in meals if meal.get("ingredients"))
+
+
+class TestPrewarmRecipes:
+    """Tests for prewarm_recipes.py"""
+
+    def test_prewarm_stores_both_modes(self, meal_id):
+        result = run_prewarm("--meal-ids", meal_id)
+        assert result.returncode == 0, result.stderr
+        for servings in ["individual", "family"]:
+            response = requests.get(f"{BASE_URL}/api/recipes/{meal_id}", params={"servings": servings})
+            assert response.status_code == 200, f"{servings} recipe missing after pre-warm: {response.text}"
+
+    def test_rerun_skips_stored_recipes(self, meal_id):
+        run_prewarm("--meal-ids", meal_id)
+        stored = requests.get(f"{BASE_URL}/api/recipes/{meal_id}").json()["generated_at"]
+        result = run_prewarm("--meal-ids", meal_id)
+        assert result.returncode == 0, result.stderr
+        assert "0 generated, 2 already cached" in result.stderr
+        assert requests.get(f"{BASE_URL}/api/recipes/{meal_id}").json()["generated_at"] == stored
@@ -0,0 +1,57 @@
+"""
+Test suite for stored structured recipes
+- POST /api/ai/recipe - Stored per meal_id + servings; regenerate=true calls the AI again
+- GET /api/recipes/{meal_id} - Structured record (ingredients, steps, macros)
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def meal():
+    """A library meal with ingredients"""
+    library = requests.get(f"{BASE_URL}/api/meals/library/extended").json()
+    return next(meal for meals in library.values() for meal in meals if meal.get("ingredients"))
+
+
+def recipe_request(meal, **extra):
+    return requests.post(f"{BASE_URL}/api/ai/recipe", json={
+        "meal_name": meal["name"],
+        "meal_blueprint": meal.get("blueprint", ""),
+        "category": meal["category"],
+        "servings": "individual",
+        "meal_id": meal["id"],
+        **extra
+    })
+
+
+class TestRecipeStore:
+    """Tests for cache hit, miss and regenerate"""
+
+    def test_regenerate_then_cache_hit(self, meal):
+        generated = recipe_request(meal, regenerate=True)
+        assert generated.status_code == 200, f"Expected 200, got {generated.status_code}: {generated.text}"
+        assert generated.json()["cached"] == False
+
+        again = recipe_request(meal).json()
+        assert again["cached"] == True
+        assert again["recipe"] == generated.json()["recipe"]
+        assert again["structured"] == generated.json()["structured"]
+
+    def test_stored_record_is_structured(self, meal):
+        recipe_request(meal)
+        response = requests.get(f"{BASE_URL}/api/recipes/{meal['id']}", params={"servings": "individual"})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        structured = response.json()["structured"]
+        # Library quantities are authoritative over whatever the AI wrote
+        assert [ing["item"] for ing in structured["ingredients"]] == [ing["item"] for ing in meal["ingredients"]]
+        assert set(structured["macros"]) == {"calories", "protein", "carbs", "fat"}
+        assert isinstance(structured["steps"], list)
+
+    def test_unknown_recipe_returns_404(self):
+        response = requests.get(f"{BASE_URL}/api/recipes/TEST_no_such_meal")
+        assert response.status_code == 404
@@ -0,0 +1,135 @@
+"""
+Test suite for Shopping List Checkout
+- GET /api/shopping-list/generate - Exact quantity totals with stable item ids
+- POST /api/shopping-list/checkout - Bulk purchase into inventory
+- POST /api/shopping-list/toggle-purchased?item_id= - Positional update by stable id
+  (un-checking takes back only the amount that item added to inventory)
+"""
+
+import pytest
+import requests
+import os
+from datetime import datetime
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+@pytest.fixture(scope="module")
+def shopping_list():
+    """Save a fresh 1-week plan and its full shopping list"""
+    plan = requests.post(f"{BASE_URL}/api/meal-plan/generate", json={"weeks": 1}).json()
+    requests.post(f"{BASE_URL}/api/meal-plan/save?weeks={plan['weeks']}", json=plan["meal_plan"])
+    items = requests.get(
+        f"{BASE_URL}/api/shopping-list/generate", params={"subtract_inventory": False}
+    ).json()["shopping_list"]
+    requests.post(f"{BASE_URL}/api/shopping-list/save", json=items)
+    return requests.get(f"{BASE_URL}/api/shopping-list").json()["items"]
+
+
+class TestShoppingListTotals:
+    """Tests for aggregated shopping list amounts"""
+
+    def test_amounts_are_summed(self, shopping_list):
+        """Test that a week of Beast Oats adds up instead of collapsing to one serving"""
+        oats = next((item for item in shopping_list if item["item"] == "Rolled Oats"), None)
+        if oats is None:
+            pytest.skip("Beast Oats not in this plan")
+        assert oats["amount"] != "1/2 cup"
+        assert oats["purchase_amount"]
+
+    def test_items_have_stable_ids(self, shopping_list):
+        """Test that regenerating the list keeps the same id per item"""
+        again = requests.get(
+            f"{BASE_URL}/api/shopping-list/generate", params={"subtract_inventory": False}
+        ).json()["shopping_list"]
+        ids = {item["item"]: item["id"] for item in shopping_list}
+        assert all(ids[item["item"]] == item["id"] for item in again)
+
+
+class TestShoppingCheckout:
+    """Tests for /api/shopping-list/checkout"""
+
+    def test_checkout_marks_items_and_fills_inventory(self, shopping_list):
+        """Test that one call purchases several items"""
+        unpurchased = [item for item in shopping_list if not item["purchased"]][:3]
+        if not unpurchased:
+            pytest.skip("Nothing left to purchase")
+        ids = [item["id"] for item in unpurchased]
+
+        response = requests.post(f"{BASE_URL}/api/shopping-list/checkout", json={"item_ids": ids + ["missing-id"]})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+        data = response.json()
+        assert sorted(data["purchased"]) == sorted(ids)
+        assert data["not_found"] == ["missing-id"]
+
+        items = requests.get(f"{BASE_URL}/api/shopping-list").json()["items"]
+        assert all(item["purchased"] for item in items if item["id"] in ids)
+        inventory = {i["item"] for i in requests.get(f"{BASE_URL}/api/inventory").json()["inventory"]}
+        assert all(item["item"] in inventory for item in unpurchased)
+
+    def test_checkout_twice_is_a_no_op(self, shopping_list):
+        """Test that already-purchased items aren't added to inventory again"""
+        purchased = [item["id"] for item in requests.get(f"{BASE_URL}/api/shopping-list").json()["items"]
+                     if item["purchased"]]
+        if not purchased:
+            pytest.skip("No purchased items")
+        data = requests.post(f"{BASE_URL}/api/shopping-list/checkout", json={"item_ids": purchased}).json()
+        assert data["purchased"] == []
+        assert sorted(data["already_purchased"]) == sorted(purchased)
+
+
+class TestToggleById:
+    """Tests for toggling a single item by id"""
+
+    def test_set_purchased_is_idempotent(self, shopping_list):
+        """Test that setting an explicit state twice only changes the item once"""
+        item_id = shopping_list[-1]["id"]
+        params = {"item_id": item_id, "purchased": False}
+        first = requests.post(f"{BASE_URL}/api/shopping-list/toggle-purchased", params=params)
+        assert first.status_code == 200, f"Expected 200, got {first.status_code}: {first.text}"
+        assert first.json()["item"]["purchased"] == False
+
+        toggled = requests.post(f"{BASE_URL}/api/shopping-list/toggle-purchased", params={"item_id": item_id}).json()
+        assert toggled["item"]["purchased"] == True
+        again = requests.post(f"{BASE_URL}/api/shopping-list/toggle-purchased",
+                              params={"item_id": item_id, "purchased": True}).json()
+        assert again["item"]["purchased"] == True
+        assert sum(1 for item in again["items"] if item["id"] == item_id) == 1
+
+    def test_checkout_and_toggle_share_one_inventory_row(self, shopping_list):
+        """Test that buying the same item through checkout and toggle doesn't duplicate its row"""
+        item = shopping_list[0]
+        toggle = f"{BASE_URL}/api/shopping-list/toggle-purchased"
+        requests.post(toggle, params={"item_id": item["id"], "purchased": False})
+        today = datetime.now().strftime("%Y-%m-%d")
+
+        def todays_rows():
+            inventory = requests.get(f"{BASE_URL}/api/inventory").json()["inventory"]
+            return [row for row in inventory if row["item"] == item["item"] and row["purchased_date"] == today]
+        expected = max(len(todays_rows()), 1)
+
+        requests.post(f"{BASE_URL}/api/shopping-list/checkout", json={"item_ids": [item["id"]]})
+        assert len(todays_rows()) == expected
+        requests.post(toggle, params={"item_id": item["id"], "purchased": False})
+        requests.post(toggle, params={"item_id": item["id"], "purchased": True})
+        assert len(todays_rows()) == expected
+
+    def test_uncheck_takes_back_only_its_purchase(self, shopping_list):
+        """Test that check then uncheck leaves the item's inventory rows exactly as they were"""
+        item = shopping_list[1]
+        toggle = f"{BASE_URL}/api/shopping-list/toggle-purchased"
+        requests.post(toggle, params={"item_id": item["id"], "purchased": False})
+
+        def rows():
+            inventory = requests.get(f"{BASE_URL}/api/inventory").json()["inventory"]
+            return sorted((row["amount"], row["purchased_date"]) for row in inventory if row["item"] == item["item"])
+        before = rows()
+
+        requests.post(toggle, params={"item_id": item["id"], "purchased": True})
+        assert rows() != before
+        requests.post(toggle, params={"item_id": item["id"], "purchased": False})
+        assert rows() == before
+
+    def test_unknown_id_returns_404(self):
+        response = requests.post(f"{BASE_URL}/api/shopping-list/toggle-purchased", params={"item_id": "nope"})
+        assert response.status_code == 404
@@ -0,0 +1,54 @@
+"""
+Test suite for Shopping List minus Inventory
+- GET /api/shopping-list/generate - Subtracts stock on hand (matched by normalised name)
+- GET /api/shopping-list/generate?subtract_inventory=false - Full plan totals
+"""
+
+import pytest
+import requests
+import os
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+def generate(subtract_inventory=True):
+    response = requests.get(f"{BASE_URL}/api/shopping-list/generate", params={"subtract_inventory": subtract_inventory})
+    assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+    return response.json()
+
+
+@pytest.fixture(scope="module")
+def full_list():
+    """Save a fresh 1-week plan and return its list without subtracting inventory"""
+    plan = requests.post(f"{BASE_URL}/api/meal-plan/generate", json={"weeks": 1}).json()
+    requests.post(f"{BASE_URL}/api/meal-plan/save?weeks={plan['weeks']}", json=plan["meal_plan"])
+    return generate(subtract_inventory=False)
+
+
+class TestInventorySubtraction:
+    """Tests for subtract_inventory"""
+
+    def test_full_list_ignores_inventory(self, full_list):
+        assert full_list["shopping_list"]
+        assert full_list["covered_by_inventory"] == []
+
+    def test_stocked_item_is_covered(self, full_list):
+        """Test that stocking the full amount (lower-case spelling) takes an item off the list"""
+        item = full_list["shopping_list"][0]
+        stocked = item["item"].lower()
+        requests.post(f"{BASE_URL}/api/inventory/add", json={
+            "item": stocked, "amount": item["amount"], "category": item["category"]
+        })
+        try:
+            data = generate()
+            assert item["item"] not in [i["item"] for i in data["shopping_list"]]
+            assert item["item"] in data["covered_by_inventory"]
+            # Inventory never changes the plan's own totals
+            assert generate(subtract_inventory=False)["shopping_list"] == full_list["shopping_list"]
+        finally:
+            requests.delete(f"{BASE_URL}/api/inventory/{stocked}")
+
+    def test_subtracted_list_only_has_plan_items(self, full_list):
+        plan_ids = {i["id"] for i in full_list["shopping_list"]}
+        for item in generate()["shopping_list"]:
+            assert item["id"] in plan_ids
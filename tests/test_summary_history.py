@@ -0,0 +1,125 @@
+"""
+Test suite for Historical Weekly Summaries
+- GET /api/summary/weekly?week=YYYY-Www - Summary for any ISO week
+- GET /api/summary/range - Per-week summaries and totals for a span
+- Materialized summaries refresh after writes
+"""
+
+import requests
+import os
+from datetime import datetime, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+
+def iso_week(day):
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class TestHistoricalWeeklySummary:
+    """Tests for ?week= on the weekly summary"""
+
+    def test_past_week_returns_that_week(self):
+        """Test that a past week returns its own Monday-Sunday range"""
+        past = datetime.now() - timedelta(weeks=3)
+        response = requests.get(f"{BASE_URL}/api/summary/weekly", params={"week": iso_week(past)})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+
+        data = response.json()
+        monday = past - timedelta(days=past.weekday())
+        assert data["week_start"] == monday.strftime("%Y-%m-%d")
+        assert data["week_end"] == (monday + timedelta(days=6)).strftime("%Y-%m-%d")
+        assert data["closed"] == True, "Past week should be closed"
+
+    def test_current_week_matches_default(self):
+        """Test that ?week= for this week matches the default summary"""
+        default = requests.get(f"{BASE_URL}/api/summary/weekly").json()
+        explicit = requests.get(f"{BASE_URL}/api/summary/weekly", params={"week": iso_week(datetime.now())}).json()
+        assert default["week_start"] == explicit["week_start"]
+        assert default["closed"] == False
+
+    def test_invalid_week_returns_400(self):
+        """Test that a malformed week id is rejected"""
+        response = requests.get(f"{BASE_URL}/api/summary/weekly", params={"week": "2026-13"})
+        assert response.status_code == 400, f"Expected 400, got {response.status_code}"
+
+    def test_habit_toggle_refreshes_current_week(self):
+        """Test that the materialized summary is invalidated by a habit write"""
+        today = datetime.now().strftime("%Y-%m-%d")
+        requests.post(f"{BASE_URL}/api/habits/toggle", json={"date": today, "completed": False})
+        before = requests.get(f"{BASE_URL}/api/summary/weekly").json()["habits"]["completed"]
+
+        requests.post(f"{BASE_URL}/api/habits/toggle", json={"date": today, "completed": True})
+        after = requests.get(f"{BASE_URL}/api/summary/weekly").json()["habits"]["completed"]
+        assert after == before + 1, f"Expected {before + 1} completed habits, got {after}"
+
+    def test_plan_save_refreshes_closed_weeks(self):
+        """Test that saving a plan refreshes closed weeks it adds to and removes from"""
+        original = requests.get(f"{BASE_URL}/api/meal-plan").json()
+        past_day = "2020-03-18"
+        params = {"week": "2020-W12"}
+        try:
+            requests.post(f"{BASE_URL}/api/meal-plan/save?weeks=1", json=[])
+            assert requests.get(f"{BASE_URL}/api/summary/weekly", params=params).json()["meals"]["planned"] == 0
+
+            requests.post(f"{BASE_URL}/api/meal-plan/save?weeks=1", json=[{
+                "date": past_day, "meal_type": "lunch", "meal_id": "TEST_meal", "meal_name": "TEST Meal"
+            }])
+            assert requests.get(f"{BASE_URL}/api/summary/weekly", params=params).json()["meals"]["planned"] == 1
+
+            requests.post(f"{BASE_URL}/api/meal-plan/save?weeks=1", json=[])
+            assert requests.get(f"{BASE_URL}/api/summary/weekly", params=params).json()["meals"]["planned"] == 0
+        finally:
+            requests.post(f"{BASE_URL}/api/meal-plan/save?weeks={original['weeks']}", json=original["meal_plan"])
+
+
+class TestSummaryRange:
+    """Tests for /api/summary/range"""
+
+    def test_range_returns_each_week(self):
+        """Test that the range returns one summary per week plus totals"""
+        start = iso_week(datetime.now() - timedelta(weeks=4))
+        response = requests.get(f"{BASE_URL}/api/summary/range", params={"start": start})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+
+        data = response.json()
+        assert len(data["weeks"]) == 5
+        assert data["totals"]["weeks"] == 5
+        assert data["totals"]["workouts_completed"] == sum(w["workouts"]["completed"] for w in data["weeks"])
+
+    def test_range_end_before_start_returns_400(self):
+        """Test that an inverted range is rejected"""
+        response = requests.get(f"{BASE_URL}/api/summary/range", params={"start": "2026-W10", "end": "2026-W02"})
+        assert response.status_code == 400
+
+    def test_range_too_long_returns_400(self):
+        """Test that very long spans are rejected"""
+        response = requests.get(f"{BASE_URL}/api/summary/range", params={"start": "2000-W01", "end": "2020-W01"})
+        assert response.status_code == 400
+
+
+class TestBackfilledMetrics:
+    """Tests that summaries place metrics by their timestamp"""
+
+    def test_backfilled_metrics_belong_to_their_week(self):
+        for date, weight in [("2020-02-28", 230), ("2020-03-04", 228)]:
+            requests.post(f"{BASE_URL}/api/metrics", json={
+                "date": date, "weight": weight, "waist": 38, "neck": 16, "body_fat": 0,
+                "timestamp": f"{date}T08:00:00Z"
+            })
+        data = requests.get(f"{BASE_URL}/api/summary/weekly", params={"week": "2020-W10"}).json()
+        assert data["body_progress"]["current_weight"] == 228
+        assert data["body_progress"]["weight_change"] == -2.0
+
+    def test_locale_dated_metric_uses_timestamp_week(self):
+        """Test that a metric posted with a locale date string still counts in its timestamp's week"""
+        for date, weight in [("2020-03-04", 228), ("2020-03-10", 226)]:
+            year, month, day = date.split("-")
+            requests.post(f"{BASE_URL}/api/metrics", json={
+                "date": f"{int(month)}/{int(day)}/{year}", "weight": weight, "waist": 38, "neck": 16, "body_fat": 0,
+                "timestamp": f"{date}T08:00:00Z"
+            })
+        data = requests.get(f"{BASE_URL}/api/summary/weekly", params={"week": "2020-W11"}).json()
+        assert data["body_progress"]["current_weight"] == 226
+        assert data["body_progress"]["weight_change"] == -2.0
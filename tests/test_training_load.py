@@ -0,0 +1,89 @@
+"""
+Test suite for Training Load
+- GET /api/workouts/load - Daily load, acute/chronic sums, ACWR advice
+- POST /api/workouts - Logging a workout updates the rolling sums
+- DELETE /api/workouts/{date} - Deleting a workout takes its load back out
+"""
+
+import pytest
+import requests
+import os
+from datetime import datetime, timedelta
+
+BASE_URL = os.environ.get('REACT_APP_BACKEND_URL', '').rstrip('/')
+
+# 3 x 10 x 100 lbs tonnage + 30 minutes x 100 load/minute
+TEST_WORKOUT_LOAD = 3000 + 30 * 100
+
+
+@pytest.fixture
+def free_date():
+    """A date in the acute window with no workout logged"""
+    for offset in range(2, 7):
+        date = (datetime.now() - timedelta(days=offset)).strftime("%Y-%m-%d")
+        if requests.get(f"{BASE_URL}/api/workouts/{date}").json()["workout"] is None:
+            yield date
+            requests.delete(f"{BASE_URL}/api/workouts/{date}")
+            return
+    pytest.skip("No free date in the last week")
+
+
+def log_test_workout(date):
+    return requests.post(f"{BASE_URL}/api/workouts", json={
+        "date": date,
+        "workout_type": "TEST_Load",
+        "exercises": [{"exercise": "TEST_Load Squat", "sets": 3, "reps": 10, "weight": 100.0}],
+        "duration_minutes": 30,
+        "notes": "Training load test"
+    })
+
+
+class TestTrainingLoadState:
+    """Tests for GET /api/workouts/load"""
+
+    def test_load_has_series_and_status(self):
+        response = requests.get(f"{BASE_URL}/api/workouts/load", params={"days": 14})
+        assert response.status_code == 200, f"Expected 200, got {response.status_code}: {response.text}"
+
+        data = response.json()
+        assert len(data["series"]) == 14
+        assert data["series"][-1]["date"] == data["as_of"]
+        assert data["acute_load"] <= data["chronic_load"]
+        assert data["status"] in ["insufficient_history", "undertrained", "optimal", "caution", "deload"]
+
+    def test_short_history_gives_no_ratio_advice(self):
+        """Test that ratio bands only apply once there are enough days of history"""
+        data = requests.get(f"{BASE_URL}/api/workouts/load").json()
+        if data["history_days"] >= 21:
+            assert data["acwr"] is not None
+        else:
+            assert data["status"] == "insufficient_history"
+            assert data["acwr"] is None
+
+
+class TestTrainingLoadWrites:
+    """Tests that workout writes keep the rolling sums current"""
+
+    def test_log_and_delete_workout(self, free_date):
+        before = requests.get(f"{BASE_URL}/api/workouts/load").json()
+
+        assert log_test_workout(free_date).status_code == 200
+        logged = requests.get(f"{BASE_URL}/api/workouts/load").json()
+        assert logged["acute_load"] == before["acute_load"] + TEST_WORKOUT_LOAD
+        assert logged["chronic_load"] == before["chronic_load"] + TEST_WORKOUT_LOAD
+        day = next(d for d in logged["series"] if d["date"] == free_date)
+        assert day["load"] == TEST_WORKOUT_LOAD
+
+        assert requests.delete(f"{BASE_URL}/api/workouts/{free_date}").status_code == 200
+        deleted = requests.get(f"{BASE_URL}/api/workouts/load").json()
+        assert deleted["acute_load"] == before["acute_load"]
+        assert deleted["chronic_load"] == before["chronic_load"]
+
+    def test_incremental_sums_match_rebuild(self, free_date):
+        """Test that the incrementally maintained state equals a full rebuild"""
+        log_test_workout(free_date)
+        incremental = requests.get(f"{BASE_URL}/api/workouts/load").json()
+        requests.post(f"{BASE_URL}/api/workouts/load/rebuild")
+        rebuilt = requests.get(f"{BASE_URL}/api/workouts/load").json()
+        assert incremental["acute_load"] == rebuilt["acute_load"]
+        assert incremental["chronic_load"] == rebuilt["chronic_load"]